@@ -0,0 +1,371 @@
+import io
+import math
+import argparse
+import numpy as np
+from time import perf_counter
+
+from db.database import engine, SessionLocal
+from db.partitions import create_partitions
+from controllers.password import get_password_hash
+from prestart import create_default_accounts
+
+
+LATITUDE_RANGE = (-80.0, 80.0)
+LONGITUDE_RANGE = (-170.0, 170.0)
+COPY_CHUNK_SIZE = 1_000_000
+
+
+class Lattice:
+    def __init__(self, points: int):
+        self.rows = max(int(math.sqrt(points)), 2)
+        self.cols = max(points // self.rows, 2)
+        self.size = self.rows * self.cols
+        self.latitudes = np.linspace(*LATITUDE_RANGE, self.rows)
+        self.longitudes = np.linspace(*LONGITUDE_RANGE, self.cols)
+
+    def get_index(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        return np.clip(rows, 0, self.rows - 1) * self.cols + np.mod(cols, self.cols)
+
+
+def generate_accounts(args, first_id: int) -> dict:
+    ids = np.arange(first_id, first_id + args.chippers)
+    return {
+        "id": ids,
+        "firstName": np.full(args.chippers, "chipperFirstName"),
+        "lastName": np.full(args.chippers, "chipperLastName"),
+        "email": np.char.add(np.char.add("dataset-chipper", ids.astype(str)), "@simbirsoft.com"),
+        "password": np.full(args.chippers, get_password_hash("qwerty123")),
+        "role": np.full(args.chippers, "CHIPPER"),
+        "version": np.ones(args.chippers, dtype=np.int64),
+    }
+
+
+def generate_location_points(lattice: Lattice, first_id: int) -> dict:
+    rows, cols = np.divmod(np.arange(lattice.size), lattice.cols)
+    return {
+        "id": np.arange(first_id, first_id + lattice.size),
+        "latitude": lattice.latitudes[rows],
+        "longitude": lattice.longitudes[cols],
+        "version": np.ones(lattice.size, dtype=np.int64),
+    }
+
+
+def generate_animal_types(args, first_id: int) -> dict:
+    ids = np.arange(first_id, first_id + args.types)
+    return {"id": ids, "type": np.char.add("dataset-type", ids.astype(str))}
+
+
+def generate_animals(
+    rng: np.random.Generator,
+    args,
+    lattice: Lattice,
+    first_id: int,
+    first_point_id: int,
+    chipper_ids: np.ndarray,
+    start: np.datetime64,
+) -> tuple[dict, np.ndarray, np.ndarray]:
+    size = args.animals
+    home_rows = rng.integers(0, lattice.rows, size)
+    home_cols = rng.integers(0, lattice.cols, size)
+    chipping_offsets = rng.integers(0, args.days * 86400 // 2, size)
+    animals = {
+        "id": np.arange(first_id, first_id + size),
+        "weight": np.round(rng.uniform(0.1, 500, size), 2),
+        "length": np.round(rng.uniform(0.1, 5, size), 2),
+        "height": np.round(rng.uniform(0.1, 3, size), 2),
+        "gender": rng.choice(np.array(["MALE", "FEMALE", "OTHER"]), size),
+        "lifeStatus": np.full(size, "ALIVE", dtype=object),
+        "chippingDateTime": start + chipping_offsets.astype("timedelta64[s]"),
+        "chipperId": rng.choice(chipper_ids, size),
+        "chippingLocationId": first_point_id + lattice.get_index(home_rows, home_cols),
+        "deathDateTime": np.full(size, np.datetime64("NaT"), dtype="datetime64[s]"),
+        "version": np.ones(size, dtype=np.int64),
+    }
+    return animals, home_rows, home_cols
+
+
+def generate_animal_type_links(rng: np.random.Generator, animal_ids: np.ndarray, type_ids: np.ndarray) -> dict:
+    # У каждого животного 1–3 разных типа: первый случайный, остальные — следующие по кругу
+    counts = rng.integers(1, min(3, len(type_ids)) + 1, len(animal_ids))
+    first = rng.integers(0, len(type_ids), len(animal_ids))
+    shifts = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return {
+        "id_animal": np.repeat(animal_ids, counts),
+        "id_animal_type": type_ids[(np.repeat(first, counts) + shifts) % len(type_ids)],
+    }
+
+
+def generate_visits(
+    rng: np.random.Generator,
+    args,
+    lattice: Lattice,
+    animals: dict,
+    home_rows: np.ndarray,
+    home_cols: np.ndarray,
+    first_id: int,
+    first_point_id: int,
+) -> dict:
+    counts = rng.poisson(args.visits, len(home_rows))
+    total = int(counts.sum())
+    starts = np.cumsum(counts) - counts
+    owner = np.repeat(np.arange(len(home_rows)), counts)
+
+    if args.movement == "territorial":
+        rows = home_rows[owner] + np.rint(rng.normal(0, args.step, total)).astype(np.int64)
+        cols = home_cols[owner] + np.rint(rng.normal(0, args.step, total)).astype(np.int64)
+    else:
+        row_steps = np.rint(rng.normal(0, args.step, total)).astype(np.int64)
+        col_steps = np.rint(rng.normal(0, args.step, total)).astype(np.int64)
+        if args.movement == "migration":
+            angles = rng.uniform(0, 2 * math.pi, len(home_rows))[owner]
+            row_steps += np.rint(np.sin(angles) * args.drift).astype(np.int64)
+            col_steps += np.rint(np.cos(angles) * args.drift).astype(np.int64)
+        rows = home_rows[owner] + _segmented_cumsum(row_steps, counts, starts)
+        cols = home_cols[owner] + _segmented_cumsum(col_steps, counts, starts)
+    points = lattice.get_index(rows, cols)
+
+    # Соседние посещения (и первое посещение относительно точки чипирования)
+    # не должны совпадать — сдвигаем совпавшие точки на соседнюю колонку
+    home_points = lattice.get_index(home_rows, home_cols)
+    is_first = np.zeros(total, dtype=bool)
+    is_first[starts[counts > 0]] = True
+    while True:
+        previous = np.where(is_first, home_points[owner], np.roll(points, 1))
+        repeated = points == previous
+        if not repeated.any():
+            break
+        points[repeated] = np.where(
+            points[repeated] % lattice.cols == lattice.cols - 1,
+            points[repeated] - 1,
+            points[repeated] + 1,
+        )
+
+    gaps = rng.exponential(args.days * 86400 / 2 / max(args.visits, 1), total)
+    offsets = _segmented_cumsum(np.maximum(gaps.astype(np.int64), 1), counts, starts)
+    dates = animals["chippingDateTime"][owner] + offsets.astype("timedelta64[s]")
+
+    is_dead = rng.random(len(home_rows)) < args.dead_ratio
+    last_dates = animals["chippingDateTime"].copy()
+    has_visits = counts > 0
+    last_dates[has_visits] = dates[starts[has_visits] + counts[has_visits] - 1]
+    animals["lifeStatus"][is_dead] = "DEAD"
+    animals["deathDateTime"][is_dead] = last_dates[is_dead] + np.timedelta64(86400, "s")
+
+    return {
+        "id": np.arange(first_id, first_id + total),
+        "id_animal": animals["id"][owner],
+        "locationPointId": first_point_id + points,
+        "dateTimeOfVisitLocationPoint": dates,
+    }
+
+
+def generate_areas(rng: np.random.Generator, args, first_id: int, first_point_id: int) -> tuple[dict, dict]:
+    # Зоны — выпуклые многоугольники внутри непересекающихся ячеек сетки
+    cols = math.ceil(math.sqrt(args.areas))
+    rows = math.ceil(args.areas / cols)
+    cell_height = (LATITUDE_RANGE[1] - LATITUDE_RANGE[0]) / rows
+    cell_width = (LONGITUDE_RANGE[1] - LONGITUDE_RANGE[0]) / cols
+    area_ids = np.arange(first_id, first_id + args.areas)
+
+    vertices = rng.integers(3, args.max_vertices + 1, args.areas)
+    owner = np.repeat(np.arange(args.areas), vertices)
+    starts = np.cumsum(vertices) - vertices
+    angle_steps = rng.uniform(0.5, 1.5, len(owner))
+    angles = _segmented_cumsum(angle_steps, vertices, starts)
+    totals = np.add.reduceat(angle_steps, starts) + rng.uniform(0.5, 1.5, args.areas)
+    angles = angles / totals[owner] * 2 * math.pi
+
+    cell_rows, cell_cols = np.divmod(np.arange(args.areas), cols)
+    center_lat = LATITUDE_RANGE[0] + (cell_rows[owner] + 0.5) * cell_height
+    center_lon = LONGITUDE_RANGE[0] + (cell_cols[owner] + 0.5) * cell_width
+    radius = 0.45 * (1 - args.area_margin)
+
+    areas = {
+        "id": area_ids,
+        "name": np.char.add("dataset-area", area_ids.astype(str)),
+        "version": np.ones(args.areas, dtype=np.int64),
+    }
+    area_points = {
+        "id": np.arange(first_point_id, first_point_id + len(owner)),
+        "id_area": area_ids[owner],
+        "latitude": np.round(center_lat + np.sin(angles) * radius * cell_height, 6),
+        "longitude": np.round(center_lon + np.cos(angles) * radius * cell_width, 6),
+    }
+    return areas, area_points
+
+
+def copy_table(cursor, table: str, columns: dict):
+    names = list(columns)
+    size = len(columns[names[0]])
+    quoted_names = ", ".join(f'"{name}"' for name in names)
+    for start in range(0, size, COPY_CHUNK_SIZE):
+        end = min(start + COPY_CHUNK_SIZE, size)
+        values = [_to_csv_values(columns[name][start:end]) for name in names]
+        buffer = io.StringIO()
+        buffer.write("\n".join(map(",".join, zip(*values))))
+        buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(
+            f'COPY "{table}" ({quoted_names}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def _to_csv_values(values: np.ndarray) -> list[str]:
+    if np.issubdtype(values.dtype, np.datetime64):
+        strings = np.datetime_as_string(values, unit="s", timezone="UTC")
+        is_nat = np.isnat(values)
+        if is_nat.any():
+            strings[is_nat] = ""
+        return strings.tolist()
+    if np.issubdtype(values.dtype, np.integer):
+        return list(map(str, values.tolist()))
+    return values.astype(str).tolist()
+
+
+def _segmented_cumsum(values: np.ndarray, counts: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    totals = np.cumsum(values)
+    offsets = np.concatenate(([0], totals))[starts]
+    return totals - np.repeat(offsets, counts)
+
+
+def _get_next_id(cursor, table: str) -> int:
+    cursor.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM "{table}"')
+    return cursor.fetchone()[0]
+
+
+def _drop_indexes(cursor, table: str) -> list[str]:
+    # Вторичные индексы дешевле построить заново после COPY, чем обновлять построчно
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint)",
+        (table,),
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    # У партиционированной таблицы определение содержит ON ONLY: такой индекс
+    # создаётся только на родителе и остаётся невалидным, а DROP удалил его
+    # и со всех партиций, поэтому индекс пересоздаётся на всей иерархии
+    return [definition.replace(" ON ONLY ", " ON ", 1) for _, definition in indexes]
+
+
+def _check_indexes(cursor, table: str):
+    cursor.execute(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid "
+        "WHERE NOT pg_index.indisvalid AND pg_index.indrelid IN ("
+        "SELECT %(table)s::regclass "
+        "UNION SELECT inhrelid FROM pg_inherits WHERE inhparent = %(table)s::regclass)",
+        {"table": f'"{table}"'},
+    )
+    invalid = [name for name, in cursor.fetchall()]
+    if invalid:
+        raise RuntimeError(f"Invalid indexes on {table}: {', '.join(invalid)}")
+
+
+def _reset_sequence(cursor, table: str):
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+        f'(SELECT COALESCE(MAX(id), 1) FROM "{table}"))'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Генерация синтетического набора данных и загрузка через COPY"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--animals", type=int, default=100_000)
+    parser.add_argument("--visits", type=float, default=100,
+                        help="Среднее число посещений на животное")
+    parser.add_argument("--points", type=int, default=250_000,
+                        help="Число точек локации (узлы сетки)")
+    parser.add_argument("--areas", type=int, default=1000)
+    parser.add_argument("--max-vertices", type=int, default=8)
+    parser.add_argument("--area-margin", type=float, default=0.1,
+                        help="Доля ячейки, оставляемая пустой между зонами")
+    parser.add_argument("--types", type=int, default=50)
+    parser.add_argument("--chippers", type=int, default=100)
+    parser.add_argument("--movement", choices=["random_walk", "migration", "territorial"],
+                        default="random_walk")
+    parser.add_argument("--step", type=float, default=2,
+                        help="Стандартное отклонение шага в узлах сетки")
+    parser.add_argument("--drift", type=float, default=1,
+                        help="Смещение за шаг для модели migration")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start-date", default="2022-01-01")
+    parser.add_argument("--dead-ratio", type=float, default=0.05)
+    parser.add_argument("--no-fk-checks", action="store_true",
+                        help="Отключить проверку внешних ключей на время загрузки "
+                             "(нужны права суперпользователя)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lattice = Lattice(args.points)
+    start = np.datetime64(args.start_date, "s")
+    began = perf_counter()
+
+    with SessionLocal() as db:
+        create_default_accounts(db)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.no_fk_checks:
+            cursor.execute("SET session_replication_role = replica")
+        next_ids = {
+            table: _get_next_id(cursor, table) for table in (
+                "account", "location_point", "animal_type", "animal",
+                "animal_visited_location", "area", "area_points",
+            )
+        }
+
+        accounts = generate_accounts(args, next_ids["account"])
+        points = generate_location_points(lattice, next_ids["location_point"])
+        types = generate_animal_types(args, next_ids["animal_type"])
+        animals, home_rows, home_cols = generate_animals(
+            rng, args, lattice, next_ids["animal"], next_ids["location_point"],
+            accounts["id"], start)
+        links = generate_animal_type_links(rng, animals["id"], types["id"])
+        visits = generate_visits(
+            rng, args, lattice, animals, home_rows, home_cols,
+            next_ids["animal_visited_location"], next_ids["location_point"])
+        areas, area_points = generate_areas(rng, args, next_ids["area"], next_ids["area_points"])
+        print(f"Generated {len(visits['id'])} visits in {perf_counter() - began:.1f} s")
+        connection.commit()
+
+        if len(visits["id"]):
+            dates = visits["dateTimeOfVisitLocationPoint"]
+            with engine.begin() as partition_connection:
+                create_partitions(partition_connection, dates.min().item(), dates.max().item())
+
+        for table, columns in (
+            ("account", accounts),
+            ("location_point", points),
+            ("animal_type", types),
+            ("animal", animals),
+            ("animalType_animal", links),
+            ("animal_visited_location", visits),
+            ("area", areas),
+            ("area_points", area_points),
+        ):
+            table_began = perf_counter()
+            indexes = _drop_indexes(cursor, table)
+            copy_table(cursor, table, columns)
+            for definition in indexes:
+                cursor.execute(definition)
+            _check_indexes(cursor, table)
+            if table != "animalType_animal":
+                _reset_sequence(cursor, table)
+            print(f"{table}: {len(next(iter(columns.values())))} rows "
+                  f"in {perf_counter() - table_began:.1f} s")
+        connection.commit()
+
+        cursor.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+    print(f"Done in {perf_counter() - began:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import sys
+import json
+import uuid
+import random
+import asyncio
+import argparse
+import numpy as np
+from time import perf_counter
+from contextvars import ContextVar
+from datetime import datetime, date
+from httpx import AsyncClient, Limits, Response, BasicAuth
+
+
+# Сценарий: роутер, ожидаемый код ответа и функция запроса (клиент, данные, номер)
+SCENARIOS = {}
+
+current_worker: ContextVar[int] = ContextVar("current_worker")
+
+
+def scenario(name: str, router: str, expected_status: int = 200):
+    def decorator(func):
+        SCENARIOS[name] = (router, expected_status, func)
+        return func
+    return decorator
+
+
+@scenario("registration", "registration", 201)
+async def register(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    request = client.build_request("POST", "/registration", json={
+        "firstName": "load",
+        "lastName": "test",
+        "email": f"load-{fixtures['run']}-{number}@simbirsoft.com",
+        "password": "qwerty123",
+    })
+    request.headers.pop("Authorization", None)
+    return await client.send(request, auth=None)  # type: ignore
+
+
+@scenario("accounts_get", "accounts")
+async def get_account(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get(f"/accounts/{fixtures['account_id']}")
+
+
+@scenario("accounts_search", "accounts")
+async def search_accounts(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get("/accounts/search", params={"email": "simbirsoft", "size": 20})
+
+
+@scenario("locations_get", "locations")
+async def get_location(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    point_ids = fixtures["point_ids"]
+    return await client.get(f"/locations/{point_ids[number % len(point_ids)]}")
+
+
+@scenario("locations_post", "locations", 201)
+async def add_location(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.post("/locations", json=fixtures["random_point"]())
+
+
+@scenario("animal_types_get", "animal_types")
+async def get_animal_type(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get(f"/animals/types/{fixtures['type_id']}")
+
+
+@scenario("animals_get", "animals")
+async def get_animal(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    animal_ids = fixtures["animal_ids"]
+    return await client.get(f"/animals/{animal_ids[number % len(animal_ids)]}")
+
+
+@scenario("animals_search", "animals")
+async def search_animals(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get("/animals/search", params={
+        "chippingLocationId": fixtures["point_ids"][0], "size": 20})
+
+
+@scenario("animals_post", "animals", 201)
+async def add_animal(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.post("/animals", json=fixtures["animal"])
+
+
+@scenario("visited_locations_get", "visited_locations")
+async def get_visited_locations(
+    client: AsyncClient,
+    fixtures: dict,
+    number: int
+) -> Response:
+    animal_ids = fixtures["animal_ids"]
+    return await client.get(f"/animals/{animal_ids[number % len(animal_ids)]}/locations")
+
+
+@scenario("visited_locations_post", "visited_locations", 201)
+async def add_visited_location(
+    client: AsyncClient,
+    fixtures: dict,
+    number: int
+) -> Response:
+    # У каждого воркера своё животное, точки чередуются и не повторяют предыдущую
+    animal_id = fixtures["animal_ids"][current_worker.get()]
+    point_id = fixtures["next_point"](animal_id)
+    return await client.post(f"/animals/{animal_id}/locations/{point_id}")
+
+
+@scenario("areas_get", "areas")
+async def get_area(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get(f"/areas/{fixtures['area_id']}")
+
+
+@scenario("areas_analytics", "areas")
+async def get_area_analytics(client: AsyncClient, fixtures: dict, number: int) -> Response:
+    return await client.get(f"/areas/{fixtures['area_id']}/analytics", params={
+        "startDate": "2000-01-01", "endDate": date.today().isoformat()})
+
+
+async def create_fixtures(client: AsyncClient, workers: int, seed: int | None) -> dict:
+    rnd = random.Random(seed)
+    run = uuid.uuid4().hex[:8]
+
+    def random_point(lat: float = -89, lon: float = -179, size: float = 178) -> dict:
+        return {
+            "latitude": round(lat + rnd.random() * size, 9),
+            "longitude": round(lon + rnd.random() * size * 2, 9),
+        }
+
+    for _ in range(20):
+        lat, lon = rnd.uniform(-80, 79), rnd.uniform(-170, 169)
+        response = await client.post("/areas", json={
+            "name": f"load-{run}",
+            "areaPoints": [
+                {"latitude": lat, "longitude": lon},
+                {"latitude": lat, "longitude": lon + 1},
+                {"latitude": lat + 1, "longitude": lon + 1},
+                {"latitude": lat + 1, "longitude": lon},
+            ],
+        })
+        if response.status_code == 201:
+            break
+    else:
+        raise SystemExit("Could not create a non-overlapping benchmark area")
+    area_id = response.json()["id"]
+
+    point_ids = []
+    for _ in range(3):
+        response = await client.post("/locations", json=random_point(lat, lon, 0.5))
+        response.raise_for_status()
+        point_ids.append(response.json()["id"])
+
+    response = await client.post("/animals/types", json={"type": f"load-{run}"})
+    response.raise_for_status()
+    type_id = response.json()["id"]
+
+    response = await client.get("/accounts/search", params={"size": 1})
+    response.raise_for_status()
+    account_id = response.json()[0]["id"]
+
+    animal = {
+        "animalTypes": [type_id],
+        "weight": 10.5,
+        "length": 1.2,
+        "height": 0.7,
+        "gender": "FEMALE",
+        "chipperId": account_id,
+        "chippingLocationId": point_ids[0],
+    }
+    animal_ids = []
+    for _ in range(workers):
+        response = await client.post("/animals", json=animal)
+        response.raise_for_status()
+        animal_ids.append(response.json()["id"])
+        for point_id in point_ids[1:]:
+            (await client.post(
+                f"/animals/{animal_ids[-1]}/locations/{point_id}")).raise_for_status()
+
+    last_points = {animal_id: point_ids[-1] for animal_id in animal_ids}
+
+    def next_point(animal_id: int) -> int:
+        last_points[animal_id] = (
+            point_ids[1] if last_points[animal_id] == point_ids[2] else point_ids[2])
+        return last_points[animal_id]
+
+    return {
+        "run": run,
+        "area_id": area_id,
+        "point_ids": point_ids,
+        "type_id": type_id,
+        "account_id": account_id,
+        "animal": animal,
+        "animal_ids": animal_ids,
+        "random_point": random_point,
+        "next_point": next_point,
+    }
+
+
+async def run_scenario(
+    client: AsyncClient,
+    fixtures: dict,
+    name: str,
+    concurrency: int,
+    duration: float,
+    max_requests: int | None
+) -> dict:
+    _, expected_status, request = SCENARIOS[name]
+    latencies = []
+    errors = 0
+    counter = 0
+
+    async def worker(worker_number: int):
+        nonlocal errors, counter
+        current_worker.set(worker_number)
+        while perf_counter() < deadline and (max_requests is None or counter < max_requests):
+            number = counter
+            counter += 1
+            start = perf_counter()
+            try:
+                response = await request(client, fixtures, number)
+                is_ok = response.status_code == expected_status
+            except Exception:
+                is_ok = False
+            if is_ok:
+                latencies.append(perf_counter() - start)
+            else:
+                errors += 1
+
+    start = perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    result = {
+        "router": SCENARIOS[name][0],
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2),
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        result.update(p50=round(p50, 2), p95=round(p95, 2), p99=round(p99, 2))
+    return result
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base or "p95" not in base or "p95" not in result:
+            continue
+        if result["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95']} -> {result['p95']} ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {base['throughput']} -> {result['throughput']} rps")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+async def run(args) -> dict:
+    auth = BasicAuth(args.email, args.password)
+    async with AsyncClient(
+        base_url=args.base_url,
+        auth=auth,
+        limits=Limits(max_connections=args.concurrency),
+        timeout=60,
+    ) as client:
+        if args.auth == "bearer":
+            response = await client.post("/login")
+            response.raise_for_status()
+            client.auth = None  # type: ignore
+            client.headers["Authorization"] = f"Bearer {response.json()['accessToken']}"
+
+        fixtures = await create_fixtures(client, args.concurrency, args.seed)
+        results = {
+            "meta": {
+                "baseUrl": args.base_url,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "requests": args.requests,
+                "auth": args.auth,
+                "createdAt": datetime.now().isoformat(timespec="seconds"),
+            },
+            "scenarios": {},
+        }
+        for name in args.scenarios or SCENARIOS:
+            result = await run_scenario(
+                client, fixtures, name, args.concurrency, args.duration, args.requests)
+            results["scenarios"][name] = result
+            print(f"{name:<24} {result['requests']:>7} {result['errors']:>6} "
+                  f"{result['throughput']:>9.1f} {result.get('p50', 0):>8.2f} "
+                  f"{result.get('p95', 0):>8.2f} {result.get('p99', 0):>8.2f}")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Нагрузочный тест всех роутеров API с сохранением и сравнением "
+                    "базовой линии (пропускная способность и p50/p95/p99)"
+    )
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--email", default="admin@simbirsoft.com")
+    parser.add_argument("--password", default="qwerty123")
+    parser.add_argument("--auth", choices=["basic", "bearer"], default="basic")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10,
+                        help="Длительность каждого сценария в секундах")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="Максимум запросов на сценарий")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Зерно генератора координат; повторяемо на пустой базе")
+    parser.add_argument("--output", help="Файл для сохранения результатов")
+    parser.add_argument("--baseline", help="Файл базовой линии для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Допустимое ухудшение p95 и пропускной способности")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<24} {'requests':>7} {'errors':>6} {'rps':>9} "
+          f"{'p50, ms':>8} {'p95, ms':>8} {'p99, ms':>8}")
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import sys
+import json
+import math
+import random
+import argparse
+from time import perf_counter
+from shapely.geometry import Polygon
+
+from db import models
+from models import schemas
+from controllers.area import get_polygon, check_new_area_overlap
+from controllers.check import check_border_intersect_in_polygon
+from controllers.analytics import (
+    save_animals_with_vis_loc_in_area,
+    save_and_sort_animals_with_vis_locs_in_area,
+)
+
+
+# Бенчмарк: функция подготовки входных данных по размеру и измеряемая функция
+BENCHMARKS = {}
+
+
+def benchmark(name: str, unit: str):
+    def decorator(func):
+        BENCHMARKS[name] = (unit, func)
+        return func
+    return decorator
+
+
+def make_visited_locations(size: int, rnd: random.Random) -> list[models.AnimalVisitedLocation]:
+    location_points = [
+        models.LocationPoint(
+            id=point_id, latitude=rnd.uniform(-20, 20), longitude=rnd.uniform(-20, 20))
+        for point_id in range(1, 1001)
+    ]
+    animals = max(size // 100, 1)
+    return [
+        models.AnimalVisitedLocation(
+            id=i,
+            id_animal=i % animals + 1,
+            location_point=location_points[i % len(location_points)],
+        )
+        for i in range(size)
+    ]
+
+
+def make_area_points(vertices: int, center: tuple = (0, 0), radius: float = 10) -> list[schemas.Point]:
+    return [
+        schemas.Point(
+            latitude=center[0] + radius * math.sin(2 * math.pi * i / vertices),
+            longitude=center[1] + radius * math.cos(2 * math.pi * i / vertices),
+        )
+        for i in range(vertices)
+    ]
+
+
+def make_areas(size: int) -> list[models.Area]:
+    # Непересекающиеся квадраты, по одному в ячейке сетки
+    cols = math.ceil(math.sqrt(size))
+    areas = []
+    for area_id in range(size):
+        lat = -80 + area_id // cols * 160 / cols
+        lon = -170 + area_id % cols * 340 / cols
+        side = 160 / cols / 2
+        areas.append(models.Area(id=area_id, name=f"area{area_id}", areaPoints=[
+            models.AreaPoints(latitude=lat, longitude=lon),
+            models.AreaPoints(latitude=lat, longitude=lon + side),
+            models.AreaPoints(latitude=lat + side, longitude=lon + side),
+            models.AreaPoints(latitude=lat + side, longitude=lon),
+        ]))
+    return areas
+
+
+@benchmark("vis_loc_in_area", "visits")
+def bench_vis_loc_in_area(size: int, rnd: random.Random):
+    polygon = get_polygon(make_area_points(8))
+    visited_locations = make_visited_locations(size, rnd)
+    return lambda: save_animals_with_vis_loc_in_area(set(), polygon, visited_locations)
+
+
+@benchmark("sort_vis_locs_in_area", "visits")
+def bench_sort_vis_locs_in_area(size: int, rnd: random.Random):
+    polygon = get_polygon(make_area_points(8))
+    visited_locations = make_visited_locations(size, rnd)
+    return lambda: save_and_sort_animals_with_vis_locs_in_area(
+        set(), set(), set(), polygon, visited_locations)
+
+
+@benchmark("get_polygon", "vertices")
+def bench_get_polygon(size: int, rnd: random.Random):
+    area_points = make_area_points(size)
+    return lambda: get_polygon(area_points)
+
+
+@benchmark("border_intersect", "vertices")
+def bench_border_intersect(size: int, rnd: random.Random):
+    polygon = get_polygon(make_area_points(size))
+    return lambda: check_border_intersect_in_polygon(polygon)
+
+
+@benchmark("area_overlap", "areas")
+def bench_area_overlap(size: int, rnd: random.Random):
+    # Новая зона вне сетки, поэтому цикл проверяет все существующие зоны
+    new_polygon = Polygon([(85, 0), (85, 1), (86, 1), (86, 0)])
+    areas = make_areas(size)
+    return lambda: check_new_area_overlap(new_polygon, areas)
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def get_slope(points: list[dict]) -> float | None:
+    # Наклон в логарифмических осях: 1 — линейный рост, 2 — квадратичный
+    if len(points) < 2:
+        return None
+    first, last = points[0], points[-1]
+    if first["seconds"] <= 0 or last["seconds"] <= 0:
+        return None
+    return round(
+        math.log(last["seconds"] / first["seconds"]) / math.log(last["size"] / first["size"]), 2)
+
+
+def run_benchmark(name: str, sizes: list[int], repeat: int, time_limit: float, seed: int) -> dict:
+    unit, prepare = BENCHMARKS[name]
+    points = []
+    for size in sizes:
+        if len(points) > 1:
+            # Прогноз по последнему отрезку кривой, чтобы не ждать квадратичные алгоритмы
+            slope = get_slope(points[-2:]) or 1
+            expected = points[-1]["seconds"] * (size / points[-1]["size"]) ** slope
+            if expected > time_limit:
+                print(f"{name:<24} {size:>10} {unit:<9} {'skipped':>12}")
+                break
+        func = prepare(size, random.Random(seed))
+        seconds = measure(func, repeat)
+        points.append({"size": size, "seconds": seconds})
+        step_slope = get_slope(points[-2:])
+        print(f"{name:<24} {size:>10} {unit:<9} {seconds * 1000:>12.3f} "
+              f"{'' if step_slope is None else step_slope:>7}")
+        if seconds > time_limit:
+            break
+    return {"unit": unit, "points": points, "slope": get_slope(points)}
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if not base or base["slope"] is None or result["slope"] is None:
+            continue
+        if result["slope"] > base["slope"] + tolerance:
+            regressions.append(f"{name}: slope {base['slope']} -> {result['slope']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Микробенчмарки аналитики и геометрии зон на синтетических данных "
+                    "в памяти с кривыми масштабирования (наклон в логарифмических осях)"
+    )
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--visits", type=int, nargs="+",
+                        default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--vertices", type=int, nargs="+",
+                        default=[10, 100, 1000, 10**4])
+    parser.add_argument("--areas", type=int, nargs="+",
+                        default=[10, 100, 1000, 10**4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=30,
+                        help="Не измерять размеры, замер которых дольше (секунды)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Файл для сохранения результатов")
+    parser.add_argument("--baseline", help="Файл базовой линии для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Допустимый рост наклона кривой масштабирования")
+    args = parser.parse_args()
+
+    sizes = {"visits": args.visits, "vertices": args.vertices, "areas": args.areas}
+    results = {"benchmarks": {}}
+    print(f"{'benchmark':<24} {'size':>10} {'unit':<9} {'best, ms':>12} {'slope':>7}")
+    for name in args.benchmarks or BENCHMARKS:
+        unit = BENCHMARKS[name][0]
+        results["benchmarks"][name] = run_benchmark(
+            name, sizes[unit], args.repeat, args.time_limit, args.seed)
+
+    print()
+    for name, result in results["benchmarks"].items():
+        print(f"{name:<24} O(n^{result['slope']})")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import pytz
+import asyncio
+import argparse
+from time import perf_counter
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from db import models
+from models import schemas
+from controllers.validation import validate_animal
+from controllers.serialization import serialize_animal
+
+
+def make_animals(size: int, visits: int) -> list[models.Animal]:
+    start = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+    animal_types = [models.AnimalType(id=i, type=f"type{i}") for i in range(1, 4)]
+    return [
+        models.Animal(
+            id=animal_id,
+            weight=10.5,
+            length=1.2,
+            height=0.7,
+            gender="FEMALE",
+            lifeStatus="ALIVE",
+            chippingDateTime=start,
+            chipperId=1,
+            chippingLocationId=1,
+            deathDateTime=None,
+            animalTypes=animal_types[:animal_id % 3 + 1],
+            visitedLocations=[
+                models.AnimalVisitedLocation(
+                    id=animal_id * visits + i,
+                    id_animal=animal_id,
+                    locationPointId=i % 2 + 2,
+                    dateTimeOfVisitLocationPoint=start + timedelta(minutes=i),
+                )
+                for i in range(visits)
+            ],
+        )
+        for animal_id in range(1, size + 1)
+    ]
+
+
+def render_with_response_model(animals: list[models.Animal]) -> bytes:
+    field = create_response_field("Response", list[schemas.Animal])
+    content = asyncio.run(serialize_response(
+        field=field,
+        response_content=[validate_animal(animal) for animal in animals],
+    ))
+    return JSONResponse(content=content).body
+
+
+def render_with_orjson(animals: list[models.Animal]) -> bytes:
+    return ORJSONResponse(content=[serialize_animal(animal) for animal in animals]).body
+
+
+def measure(render, animals: list[models.Animal], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        render(animals)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Сравнение сериализации /animals/search: response_model и "
+                    "JSONResponse против прямой сериализации в ORJSONResponse"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--visits", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'animals':>8} {'response_model, ms':>19} {'orjson, ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        animals = make_animals(size, args.visits)
+        if (json.loads(render_with_response_model(animals)) !=
+            json.loads(render_with_orjson(animals))):
+            raise SystemExit(f"Responses differ for {size} animals")
+
+        baseline = measure(render_with_response_model, animals, args.repeat)
+        fast = measure(render_with_orjson, animals, args.repeat)
+        print(f"{size:>8} {baseline * 1000:>19.2f} {fast * 1000:>11.2f} "
+              f"{baseline / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,121 @@ import os
 
 PASSWORD_SALT = os.environ["PASSWORD_SALT"]
 
-POSTGRESQL_CONFIG = os.environ["POSTGRESQL_CONFIG"]
\ No newline at end of file
+POSTGRESQL_CONFIG = os.environ["POSTGRESQL_CONFIG"]
+
+TOKEN_SECRET_KEY = os.environ["TOKEN_SECRET_KEY"]
+
+# С пустым или коротким ключом токены доступа можно подделать
+TOKEN_SECRET_KEY_MIN_LENGTH = 32
+
+if len(TOKEN_SECRET_KEY) < TOKEN_SECRET_KEY_MIN_LENGTH:
+    raise RuntimeError(
+        f"TOKEN_SECRET_KEY must be at least {TOKEN_SECRET_KEY_MIN_LENGTH} characters long"
+    )
+
+ACCESS_TOKEN_TTL = int(os.environ.get("ACCESS_TOKEN_TTL", 900))
+
+VISITED_LOCATIONS_BATCH_MAX_SIZE = int(
+    os.environ.get("VISITED_LOCATIONS_BATCH_MAX_SIZE", 10000)
+)
+
+ANIMALS_BATCH_MAX_SIZE = int(os.environ.get("ANIMALS_BATCH_MAX_SIZE", 1000))
+
+BATCH_GET_MAX_IDS = int(os.environ.get("BATCH_GET_MAX_IDS", 1000))
+
+STREAM_COMMIT_INTERVAL_MS = int(os.environ.get("STREAM_COMMIT_INTERVAL_MS", 50))
+
+STREAM_COMMIT_MAX_SIZE = int(os.environ.get("STREAM_COMMIT_MAX_SIZE", 500))
+
+ANIMAL_TYPE_CACHE_TTL = float(os.environ.get("ANIMAL_TYPE_CACHE_TTL", 30))
+
+SEARCH_COUNT_EXACT_THRESHOLD = int(
+    os.environ.get("SEARCH_COUNT_EXACT_THRESHOLD", 1000)
+)
+
+EMAIL_CHECK_DELIVERABILITY = os.environ.get(
+    "EMAIL_CHECK_DELIVERABILITY", "true"
+).lower() == "true"
+
+EMAIL_DELIVERABILITY_CACHE_TTL = float(
+    os.environ.get("EMAIL_DELIVERABILITY_CACHE_TTL", 3600)
+)
+
+EMAIL_DELIVERABILITY_CACHE_SIZE = int(
+    os.environ.get("EMAIL_DELIVERABILITY_CACHE_SIZE", 10000)
+)
+
+ACCOUNT_VERSION_CACHE_TTL = float(os.environ.get("ACCOUNT_VERSION_CACHE_TTL", 5))
+
+QUERY_DEBUG = os.environ.get("QUERY_DEBUG", "false").lower() == "true"
+
+QUERY_DEBUG_STRICT = os.environ.get("QUERY_DEBUG_STRICT", "false").lower() == "true"
+
+QUERY_DEBUG_REPEAT_THRESHOLD = int(os.environ.get("QUERY_DEBUG_REPEAT_THRESHOLD", 5))
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/profiles")
+
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 100))
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", 1))
+
+SLOW_QUERY_MAX_PER_MINUTE = int(os.environ.get("SLOW_QUERY_MAX_PER_MINUTE", 30))
+
+SERVER_BIND = os.environ.get("SERVER_BIND", "0.0.0.0:8080")
+
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", os.cpu_count() or 1))
+
+SERVER_KEEPALIVE = int(os.environ.get("SERVER_KEEPALIVE", 5))
+
+SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", 2048))
+
+SERVER_TIMEOUT = int(os.environ.get("SERVER_TIMEOUT", 60))
+
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+
+SERVER_MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS", 0))
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").lower() == "true"
+
+POSTGRESQL_REPLICA_CONFIGS = [
+    dsn.strip() for dsn in os.environ.get("POSTGRESQL_REPLICA_CONFIGS", "").split(",")
+    if dsn.strip()
+]
+
+DB_REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 10))
+
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 30))
+
+DB_REPLICA_CONNECT_TIMEOUT = int(os.environ.get("DB_REPLICA_CONNECT_TIMEOUT", 2))
+
+# Сколько секунд после записи клиент читает с primary. Привязка хранится в cookie,
+# клиенты без cookie могут прочитать данные, отстающие до DB_REPLICA_MAX_LAG
+DB_REPLICA_STICKY_SECONDS = float(
+    os.environ.get("DB_REPLICA_STICKY_SECONDS", DB_REPLICA_MAX_LAG)
+)
+
+VISITED_LOCATIONS_PARTITIONS_AHEAD = int(
+    os.environ.get("VISITED_LOCATIONS_PARTITIONS_AHEAD", 3)
+)
+
+VISITED_LOCATIONS_ARCHIVE_AFTER_DAYS = int(
+    os.environ.get("VISITED_LOCATIONS_ARCHIVE_AFTER_DAYS", 365)
+)
+
+VISITED_LOCATIONS_ARCHIVE_BATCH_SIZE = int(
+    os.environ.get("VISITED_LOCATIONS_ARCHIVE_BATCH_SIZE", 1000)
+)
@@ -2,8 +2,10 @@ from sqlalchemy.orm import Session
 from shapely import Point, Polygon
 
 from db import models
-from db.crud import get_animal_types, get_location_point
+from db.cache import animal_type_cache
+from db.crud import get_animal_type_ids_of_animals, get_location_points_by_ids
 from models.schemas import TypeAnalytics, AnalyticsGroup
+from controllers.metrics import analytics_rows_scanned_total
 
 
 def save_animals_with_vis_loc_in_area(
@@ -14,6 +16,7 @@ def save_animals_with_vis_loc_in_area(
     if not visited_locations:
         return
     
+    analytics_rows_scanned_total.inc(len(visited_locations), source="visited_location")
     for visited_location in visited_locations:
         location_point: models.LocationPoint = visited_location.location_point
         point = Point(location_point.latitude, location_point.longitude)
@@ -31,8 +34,13 @@ def save_animals_with_chip_loc_in_area(
     if not animals:
         return
     
+    analytics_rows_scanned_total.inc(len(animals), source="animal")
+    location_points = {
+        location_point.id: location_point for location_point in get_location_points_by_ids(
+            db, list({animal.chippingLocationId for animal in animals}))  # type: ignore
+    }
     for animal in animals:  # type: ignore
-        location_point = get_location_point(db, animal.chippingLocationId)
+        location_point = location_points[animal.chippingLocationId]
         point = Point(location_point.latitude, location_point.longitude)  # type: ignore
 
         if polygon.intersects(point):
@@ -49,6 +57,7 @@ def save_and_sort_animals_with_vis_locs_in_area(
     if not visited_locations:
         return
 
+    analytics_rows_scanned_total.inc(len(visited_locations), source="visited_location")
     for visited_location in visited_locations:
         db_location_point: models.LocationPoint = visited_location.location_point
         location_point = Point(db_location_point.latitude, db_location_point.longitude)
@@ -86,18 +95,28 @@ def _create_types_analytics_for_analytics_group(
     types_analytics: dict,
     group: AnalyticsGroup
 ):
-    for animal_id in animal_ids:
-        animal_types = get_animal_types(db, animal_id)
-        for animal_type in animal_types:
+    if not animal_ids:
+        return
+
+    type_ids_of_animals = get_animal_type_ids_of_animals(db, list(animal_ids))
+    analytics_rows_scanned_total.inc(
+        sum(map(len, type_ids_of_animals.values())), source="animal_type")
+    types = animal_type_cache.get_types(db)
+    if any(type_id not in types
+           for type_ids in type_ids_of_animals.values() for type_id in type_ids):
+        animal_type_cache.invalidate()
+        types = animal_type_cache.get_types(db)
+    for type_ids in type_ids_of_animals.values():
+        for type_id in type_ids:
             type_analytics = types_analytics.get(
-                animal_type.id,
+                type_id,
                 TypeAnalytics(
-                    animalType=animal_type.type,  # type: ignore
-                    animalTypeId=animal_type.id  # type: ignore
+                    animalType=types.get(type_id, ""),
+                    animalTypeId=type_id
                 )
             )
             match group:
                 case AnalyticsGroup.QUANTITY: type_analytics.quantityAnimals += 1
                 case AnalyticsGroup.ARRIVED: type_analytics.animalsArrived += 1
                 case AnalyticsGroup.GONE: type_analytics.animalsGone += 1
-            types_analytics[animal_type.id] = type_analytics
+            types_analytics[type_id] = type_analytics
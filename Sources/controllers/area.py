@@ -1,7 +1,26 @@
 from shapely.geometry import Polygon
+from fastapi import HTTPException, status
 
+from db import models
 from models import schemas
 
 
 def get_polygon(coords: list[schemas.Point]) -> Polygon:
-    return Polygon([(point.latitude, point.longitude) for point in coords])
\ No newline at end of file
+    return Polygon([(point.latitude, point.longitude) for point in coords])
+
+
+def check_new_area_overlap(new_polygon: Polygon, areas: list[models.Area]):
+    for area in areas:
+        area_polygon = Polygon(
+            [(point.latitude, point.longitude) for point in area.areaPoints]
+        )
+
+        if new_polygon.equals(area_polygon):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT)
+        if (
+            not new_polygon.touches(area_polygon)
+            and new_polygon.intersects(area_polygon)
+            or new_polygon.contains(area_polygon)
+            or area_polygon.contains(new_polygon)
+        ):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
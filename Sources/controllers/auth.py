@@ -1,7 +1,58 @@
+import base64
 from fastapi import Depends, FastAPI, Request
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, HTTPBearer
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+
+from db import models
+from config.config import TOKEN_SECRET_KEY, ACCESS_TOKEN_TTL
 
 
 security = HTTPBasic()
 
 security_without_auto_error = HTTPBasic(auto_error=False)
+
+bearer_security = HTTPBearer(auto_error=False)
+
+token_serializer = URLSafeTimedSerializer(TOKEN_SECRET_KEY, salt="access-token")
+
+
+def create_access_token(account: models.Account) -> str:
+    return token_serializer.dumps({
+        "id": account.id,
+        "role": account.role,
+        "version": account.version,
+    })
+
+
+def read_access_token(token: str) -> dict | None:
+    try:
+        payload = token_serializer.loads(token, max_age=ACCESS_TOKEN_TTL)
+    except BadSignature:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    return payload
+
+
+def parse_bearer_authorization(authorization: str | None) -> str | None:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+def parse_basic_authorization(authorization: str | None) -> HTTPBasicCredentials | None:
+    if not authorization:
+        return None
+    scheme, _, param = authorization.partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        username, separator, password = base64.b64decode(param).decode().partition(":")
+    except ValueError:
+        return None
+    if not separator:
+        return None
+    return HTTPBasicCredentials(username=username, password=password)
@@ -0,0 +1,9 @@
+from fastapi import HTTPException, Query, status
+
+from config.config import BATCH_GET_MAX_IDS
+
+
+def get_batch_ids(ids: list[int] = Query()) -> list[int]:
+    if len(ids) > BATCH_GET_MAX_IDS or any(id <= 0 for id in ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+    return list(dict.fromkeys(ids))
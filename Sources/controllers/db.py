@@ -1,9 +1,28 @@
-from db.database import SessionLocal
+from time import time
+from starlette.requests import HTTPConnection
 
+from db.database import SessionLocal, ReadSessionLocal
 
-def get_db():
-    db = SessionLocal()
+
+PRIMARY_COOKIE = "db_primary_until"
+
+
+def get_db(connection: HTTPConnection):
+    # GET-запросы читают с реплик, остальные и WebSocket работают с primary;
+    # после своей записи клиент читает с primary, пока действует cookie
+    if (connection.scope.get("method") in ("GET", "HEAD") and
+        not is_pinned_to_primary(connection)):
+        db = ReadSessionLocal()
+    else:
+        db = SessionLocal()
     try: 
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def is_pinned_to_primary(connection: HTTPConnection) -> bool:
+    try:
+        return float(connection.cookies.get(PRIMARY_COOKIE, 0)) > time()
+    except ValueError:
+        return False
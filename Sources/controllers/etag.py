@@ -0,0 +1,16 @@
+def make_etag(version: int, **variant) -> str:
+    # Разные представления одного объекта (срез, набор полей) получают разные ETag
+    parts = [str(version)] + [
+        f"{name}={value}" for name, value in sorted(variant.items()) if value is not None
+    ]
+    return f'"{";".join(parts)}"'
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,25 @@
+from fastapi import HTTPException, Query, status
+
+from models import schemas
+
+
+ANIMAL_FIELDS = list(schemas.Animal.__fields__)
+
+AREA_FIELDS = list(schemas.AreaOut.__fields__)
+
+
+def get_animal_fields(fields: str | None = Query(default=None)) -> list[str] | None:
+    return _parse_fields(fields, ANIMAL_FIELDS)
+
+
+def get_area_fields(fields: str | None = Query(default=None)) -> list[str] | None:
+    return _parse_fields(fields, AREA_FIELDS)
+
+
+def _parse_fields(fields: str | None, allowed: list[str]) -> list[str] | None:
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",")}
+    if not requested <= set(allowed):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+    return [field for field in allowed if field in requested]
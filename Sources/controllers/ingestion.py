@@ -0,0 +1,180 @@
+import json
+import pytz
+import asyncio
+from datetime import datetime
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, WebSocket, status
+
+from models import schemas
+from db.crud import (
+    create_animal_visited_locations,
+    get_existing_location_point_ids,
+    get_animals_with_last_visited_location,
+)
+from config.config import STREAM_COMMIT_INTERVAL_MS, STREAM_COMMIT_MAX_SIZE
+
+
+def ingest_visited_locations(
+    db: Session,
+    fixes: list[schemas.AnimalVisitedLocationFix]
+) -> list[schemas.AnimalVisitedLocationFixResult]:
+    if not fixes:
+        return []
+
+    point_ids = get_existing_location_point_ids(
+        db, list({fix.pointId for fix in fixes}))
+    animals = {
+        animal.id: animal for animal in get_animals_with_last_visited_location(
+            db, list({fix.animalId for fix in fixes}))
+    }
+    last_points = {id: animal.lastLocationPointId for id, animal in animals.items()}
+    last_dates = {id: animal.lastDateTimeOfVisit for id, animal in animals.items()}
+
+    now = datetime.now(tz=pytz.UTC).replace(microsecond=0)
+    results = []
+    accepted = []
+    for fix in fixes:
+        visit_datetime = _get_fix_datetime(fix, now)
+        result = schemas.AnimalVisitedLocationFixResult(
+            animalId=fix.animalId,
+            pointId=fix.pointId,
+            status=_check_fix(fix, visit_datetime, point_ids, animals,
+                              last_points, last_dates),
+        )
+        if result.status == status.HTTP_201_CREATED:
+            last_points[fix.animalId] = fix.pointId
+            last_dates[fix.animalId] = visit_datetime
+            accepted.append((result, visit_datetime))
+        results.append(result)
+
+    if accepted:
+        ids = create_animal_visited_locations(db, [
+            {
+                "id_animal": result.animalId,
+                "locationPointId": result.pointId,
+                "dateTimeOfVisitLocationPoint": visit_datetime,
+            }
+            for result, visit_datetime in accepted
+        ])
+        for (result, visit_datetime), id in zip(accepted, ids):
+            result.id = id
+            result.dateTimeOfVisitLocationPoint = visit_datetime
+    return results
+
+
+def _get_fix_datetime(
+    fix: schemas.AnimalVisitedLocationFix,
+    default: datetime
+) -> datetime:
+    if not fix.dateTimeOfVisitLocationPoint:
+        return default
+    if not fix.dateTimeOfVisitLocationPoint.tzinfo:
+        return fix.dateTimeOfVisitLocationPoint.replace(tzinfo=pytz.UTC)
+    return fix.dateTimeOfVisitLocationPoint
+
+
+def _check_fix(
+    fix: schemas.AnimalVisitedLocationFix,
+    visit_datetime: datetime,
+    point_ids: set[int],
+    animals: dict,
+    last_points: dict,
+    last_dates: dict,
+) -> int:
+    if fix.pointId not in point_ids or fix.animalId not in animals:
+        return status.HTTP_404_NOT_FOUND
+
+    animal = animals[fix.animalId]
+    last_point = last_points[fix.animalId]
+    last_date = last_dates[fix.animalId]
+    if (animal.lifeStatus == schemas.LifeStatus.DEAD or
+        last_point is None and fix.pointId == animal.chippingLocationId or
+        fix.pointId == last_point or
+        last_date and visit_datetime < last_date):
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_201_CREATED
+
+
+async def receive_visited_locations(websocket: WebSocket, db: Session):
+    loop = asyncio.get_running_loop()
+    pending: list[tuple[int | None, schemas.AnimalVisitedLocationFix]] = []
+    deadline = 0.0
+    while True:
+        timeout = max(deadline - loop.time(), 0) if pending else None
+        try:
+            message = await asyncio.wait_for(websocket.receive(), timeout)
+        except asyncio.TimeoutError:
+            await _commit_fixes(websocket, db, pending)
+            continue
+        # Неподтверждённые фиксы не сохраняются: клиент отправит их повторно
+        if message["type"] == "websocket.disconnect":
+            return
+
+        seq, fix = _parse_fix(message.get("text") or message.get("bytes") or "")
+        if not fix:
+            await websocket.send_text(schemas.AnimalVisitedLocationFixAck(
+                seq=seq, status=status.HTTP_400_BAD_REQUEST).json())
+            continue
+
+        if not pending:
+            deadline = loop.time() + STREAM_COMMIT_INTERVAL_MS / 1000
+        pending.append((seq, fix))
+        if len(pending) >= STREAM_COMMIT_MAX_SIZE:
+            await _commit_fixes(websocket, db, pending)
+
+
+def _parse_fix(
+    message: str | bytes
+) -> tuple[int | None, schemas.AnimalVisitedLocationFix | None]:
+    # Бинарные кадры разбираются как JSON в UTF-8, иначе получают 400
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+
+    seq = data.get("seq")
+    if not isinstance(seq, int):
+        seq = None
+    try:
+        return seq, schemas.AnimalVisitedLocationFix(**data)
+    except (ValidationError, HTTPException):
+        return seq, None
+
+
+async def _commit_fixes(
+    websocket: WebSocket,
+    db: Session,
+    pending: list[tuple[int | None, schemas.AnimalVisitedLocationFix]]
+):
+    results = _ingest_fixes(db, pending)
+    for (seq, _), result in zip(pending, results):
+        await websocket.send_text(schemas.AnimalVisitedLocationFixAck(
+            seq=seq,
+            status=result.status,
+            id=result.id,
+            dateTimeOfVisitLocationPoint=result.dateTimeOfVisitLocationPoint
+        ).json())
+    pending.clear()
+
+
+def _ingest_fixes(
+    db: Session,
+    pending: list[tuple[int | None, schemas.AnimalVisitedLocationFix]]
+) -> list[schemas.AnimalVisitedLocationFixResult]:
+    fixes = [fix for _, fix in pending]
+    try:
+        return ingest_visited_locations(db, fixes)
+    except SQLAlchemyError:
+        db.rollback()
+        return [
+            schemas.AnimalVisitedLocationFixResult(
+                animalId=fix.animalId,
+                pointId=fix.pointId,
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+            for fix in fixes
+        ]
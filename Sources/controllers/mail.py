@@ -1,9 +1,78 @@
-from email_validator import validate_email, EmailNotValidError
+from time import monotonic
+from threading import Lock
+from collections import OrderedDict
+from email_validator import (
+    validate_email,
+    validate_email_deliverability,
+    EmailNotValidError,
+    EmailUndeliverableError,
+)
+
+from config.config import (
+    EMAIL_CHECK_DELIVERABILITY,
+    EMAIL_DELIVERABILITY_CACHE_TTL,
+    EMAIL_DELIVERABILITY_CACHE_SIZE,
+)
+
+
+class DeliverabilityCache:
+    def __init__(self, ttl: float, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = Lock()
+        self._results: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+
+    def get(self, domain: str) -> bool | None:
+        with self._lock:
+            result = self._results.get(domain)
+            if result is None:
+                return None
+            if monotonic() - result[1] > self._ttl:
+                del self._results[domain]
+                return None
+            self._results.move_to_end(domain)
+            return result[0]
+
+    def set(self, domain: str, is_deliverable: bool):
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._results[domain] = (is_deliverable, monotonic())
+            self._results.move_to_end(domain)
+            while len(self._results) > self._max_size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+deliverability_cache = DeliverabilityCache(
+    EMAIL_DELIVERABILITY_CACHE_TTL, EMAIL_DELIVERABILITY_CACHE_SIZE)
 
 
 def is_email_valid(email: str):
     try:
-        validate_email(email)
+        validated = validate_email(email, check_deliverability=False)
     except EmailNotValidError:
         return False
-    return True
\ No newline at end of file
+    if not EMAIL_CHECK_DELIVERABILITY:
+        return True
+    return is_domain_deliverable(validated.ascii_domain, validated.domain)
+
+
+def is_domain_deliverable(ascii_domain: str, domain: str) -> bool:
+    is_deliverable = deliverability_cache.get(ascii_domain)
+    if is_deliverable is not None:
+        return is_deliverable
+
+    try:
+        info = validate_email_deliverability(ascii_domain, domain)
+    except EmailUndeliverableError:
+        deliverability_cache.set(ascii_domain, False)
+        return False
+
+    # Таймаут DNS не считается окончательным ответом и не кэшируется
+    if "unknown-deliverability" not in info:
+        deliverability_cache.set(ascii_domain, True)
+    return True
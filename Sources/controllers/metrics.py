@@ -0,0 +1,204 @@
+from bisect import bisect_left
+from threading import Lock
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _get_key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: tuple, extra: dict | None = None) -> str:
+        labels = dict(zip(self.labelnames, key))
+        if extra:
+            labels.update(extra)
+        if not labels:
+            return ""
+        return "{" + ",".join(
+            f'{name}="{_escape(value)}"' for name, value in labels.items()
+        ) + "}"
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount  # type: ignore
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount  # type: ignore
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._get_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            if index < len(self.buckets):
+                state[0][index] += 1  # type: ignore
+            state[1] += 1  # type: ignore
+            state[2] += value  # type: ignore
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        counts, count, total = value
+        lines = []
+        cumulative = 0
+        for bucket, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = self._format_labels(key, {"le": _format_float(bucket)})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._format_labels(key, {"le": "+Inf"})
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+registry = Registry()
+
+http_request_duration_seconds: Histogram = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+))  # type: ignore
+
+http_requests_in_progress: Gauge = registry.register(Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ("method",),
+))  # type: ignore
+
+db_statements_per_request: Histogram = registry.register(Histogram(
+    "db_statements_per_request",
+    "Database statements executed per HTTP request.",
+    ("route",),
+    (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+))  # type: ignore
+
+db_time_per_request_seconds: Histogram = registry.register(Histogram(
+    "db_time_per_request_seconds",
+    "Time spent in database statements per HTTP request.",
+    ("route",),
+))  # type: ignore
+
+db_pool_checkout_wait_seconds: Histogram = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))  # type: ignore
+
+db_pool_connections: Gauge = registry.register(Gauge(
+    "db_pool_connections",
+    "Connection pool size and usage.",
+    ("state",),
+))  # type: ignore
+
+db_pool_events_total: Counter = registry.register(Counter(
+    "db_pool_events_total",
+    "Connection pool events: connects, checkouts, invalidations and checkout timeouts.",
+    ("event",),
+))  # type: ignore
+
+db_replica_healthy: Gauge = registry.register(Gauge(
+    "db_replica_healthy",
+    "Whether a read replica passed its last health check.",
+    ("replica",),
+))  # type: ignore
+
+password_verifications_total: Counter = registry.register(Counter(
+    "password_verifications_total",
+    "bcrypt password verifications.",
+    ("result",),
+))  # type: ignore
+
+db_slow_queries_total: Counter = registry.register(Counter(
+    "db_slow_queries_total",
+    "Statements slower than the slow query threshold.",
+    ("function",),
+))  # type: ignore
+
+analytics_rows_scanned_total: Counter = registry.register(Counter(
+    "analytics_rows_scanned_total",
+    "Rows scanned while building area analytics.",
+    ("source",),
+))  # type: ignore
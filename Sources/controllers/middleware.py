@@ -0,0 +1,84 @@
+from time import perf_counter, time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.instrumentation import QueryStats, query_stats, report_query_stats
+from controllers.metrics import (
+    http_requests_in_progress,
+    http_request_duration_seconds,
+    db_statements_per_request,
+    db_time_per_request_seconds,
+)
+from controllers.db import PRIMARY_COOKIE
+from config.config import QUERY_DEBUG, DB_REPLICA_STICKY_SECONDS
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if QUERY_DEBUG:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-query-count", str(stats.statements).encode()),
+                    ]
+            await send(message)
+
+        stats = QueryStats(debug=QUERY_DEBUG)
+        stats.scope = scope
+        token = query_stats.set(stats)
+        http_requests_in_progress.inc(method=method)
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            http_requests_in_progress.dec(method=method)
+            query_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = route.path if route else "unmatched"
+            http_request_duration_seconds.observe(
+                duration, method=method, route=route_path, status=status_code)
+            db_statements_per_request.observe(stats.statements, route=route_path)
+            db_time_per_request_seconds.observe(stats.duration, route=route_path)
+            if QUERY_DEBUG:
+                report_query_stats(route_path, stats)
+
+
+class PrimaryStickinessMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or
+            scope["method"] in ("GET", "HEAD") or
+            DB_REPLICA_STICKY_SECONDS <= 0):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            # Успешная запись привязывает клиента к primary, пока реплики догоняют
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time() + DB_REPLICA_STICKY_SECONDS:.0f}; "
+                    f"Max-Age={DB_REPLICA_STICKY_SECONDS:.0f}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,13 +1,16 @@
 from passlib.context import CryptContext
 
 from config.config import PASSWORD_SALT
+from controllers.metrics import password_verifications_total
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password + PASSWORD_SALT, hashed_password)
+    is_verified = pwd_context.verify(plain_password + PASSWORD_SALT, hashed_password)
+    password_verifications_total.inc(result="success" if is_verified else "failure")
+    return is_verified
 
 
 def get_password_hash(password: str):
@@ -0,0 +1,125 @@
+import os
+import io
+import pstats
+import cProfile
+from uuid import uuid4
+from time import perf_counter
+from collections import defaultdict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette.concurrency import run_in_threadpool
+
+from models import schemas
+from db.database import SessionLocal
+from db.instrumentation import QueryStats, query_stats
+from controllers.user import authenticate_authorization
+from config.config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_KEEP
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._is_profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (not PROFILING_ENABLED or
+            scope["type"] != "http" or
+            self._is_profiling or
+            not _get_header(scope, b"x-profile")):
+            await self.app(scope, receive, send)
+            return
+
+        account = await run_in_threadpool(
+            _authenticate, _get_header(scope, b"authorization"))
+        if not account or account.role != schemas.Role.ADMIN or self._is_profiling:
+            await self.app(scope, receive, send)
+            return
+
+        # cProfile работает на весь поток, поэтому профилируется один запрос за раз
+        self._is_profiling = True
+        profile_id = uuid4().hex
+        profiler = cProfile.Profile()
+        stats = query_stats.get() or QueryStats()
+        stats.crud_durations = defaultdict(float)
+        start = perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                profiler.disable()
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                    (b"server-timing",
+                     _get_server_timing(perf_counter() - start, stats).encode()),
+                ]
+            await send(message)
+
+        try:
+            profiler.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._is_profiling = False
+            await run_in_threadpool(
+                _save_profile, profile_id, profiler, stats, scope["method"], scope["path"])
+
+
+def _get_header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _authenticate(authorization: str | None) -> schemas.Account | None:
+    with SessionLocal() as db:
+        return authenticate_authorization(db, authorization)
+
+
+def _get_server_timing(duration: float, stats: QueryStats) -> str:
+    metrics = [f"total;dur={duration * 1000:.2f}", f"db;dur={stats.duration * 1000:.2f}"]
+    for name, crud_duration in _get_sorted_crud_durations(stats):
+        metrics.append(f"db-{name};dur={crud_duration * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+def _get_sorted_crud_durations(stats: QueryStats) -> list[tuple[str, float]]:
+    return sorted(
+        (stats.crud_durations or {}).items(), key=lambda item: item[1], reverse=True)
+
+
+def _save_profile(
+    profile_id: str,
+    profiler: cProfile.Profile,
+    stats: QueryStats,
+    method: str,
+    path: str
+):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+
+    report = io.StringIO()
+    report.write(f"{method} {path}\n\n")
+    report.write(f"DB: {stats.statements} statements, {stats.duration * 1000:.2f} ms\n")
+    for name, crud_duration in _get_sorted_crud_durations(stats):
+        report.write(f"  {name}: {crud_duration * 1000:.2f} ms\n")
+    report.write("\n")
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(50)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.txt"), "w") as file:
+        file.write(report.getvalue())
+    _remove_old_profiles()
+
+
+def _remove_old_profiles():
+    # Хранятся только последние PROFILE_KEEP профилей, остальные удаляются
+    with os.scandir(PROFILE_DIR) as entries:
+        profiles = sorted(
+            (entry for entry in entries if entry.name.endswith(".prof")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+    for entry in profiles[:max(len(profiles) - PROFILE_KEEP, 0)]:
+        profile_id = entry.name.removesuffix(".prof")
+        for extension in (".prof", ".txt"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + extension))
+            except FileNotFoundError:
+                pass
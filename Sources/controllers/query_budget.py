@@ -0,0 +1,11 @@
+from typing import Callable
+
+from db.instrumentation import query_stats
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    async def set_query_budget():
+        stats = query_stats.get()
+        if stats is not None:
+            stats.budget = limit
+    return set_query_budget
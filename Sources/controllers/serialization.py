@@ -0,0 +1,80 @@
+from db import models
+
+
+def serialize_account(account: models.Account) -> dict:
+    return {
+        "firstName": account.firstName,
+        "lastName": account.lastName,
+        "email": account.email,
+        "id": account.id,
+        "role": account.role,
+    }
+
+
+def serialize_animal(
+    animal: models.Animal,
+    visited_locations: list[int] | dict | None = None,
+    fields: list[str] | None = None
+) -> dict:
+    if fields is not None:
+        return {
+            field: _serialize_animal_field(animal, field, visited_locations)
+            for field in fields
+        }
+    if visited_locations is None:
+        visited_locations = _serialize_visited_locations(animal)
+    return {
+        "animalTypes": [type.id for type in animal.animalTypes],
+        "weight": animal.weight,
+        "length": animal.length,
+        "height": animal.height,
+        "gender": animal.gender,
+        "chipperId": animal.chipperId,
+        "chippingLocationId": animal.chippingLocationId,
+        "id": animal.id,
+        "lifeStatus": animal.lifeStatus,
+        "chippingDateTime": animal.chippingDateTime,
+        "visitedLocations": visited_locations,
+        "deathDateTime": animal.deathDateTime,
+    }
+
+
+def _serialize_animal_field(
+    animal: models.Animal,
+    field: str,
+    visited_locations: list[int] | dict | None
+):
+    if field == "animalTypes":
+        return [type.id for type in animal.animalTypes]
+    if field == "visitedLocations":
+        if visited_locations is None:
+            return _serialize_visited_locations(animal)
+        return visited_locations
+    return getattr(animal, field)
+
+
+def _serialize_visited_locations(animal: models.Animal) -> list[int]:
+    # Архивные посещения старше живых, поэтому идут первыми
+    archived_ids = animal.visitArchive.ids if animal.visitArchive else []
+    return archived_ids + [location.id for location in animal.visitedLocations]  # type: ignore
+
+
+def serialize_area(area: models.Area, fields: list[str]) -> dict:
+    return {field: _serialize_area_field(area, field) for field in fields}
+
+
+def _serialize_area_field(area: models.Area, field: str):
+    if field == "areaPoints":
+        return [
+            {"latitude": point.latitude, "longitude": point.longitude}
+            for point in area.areaPoints
+        ]
+    return getattr(area, field)
+
+
+def serialize_visited_location(visited_location: models.AnimalVisitedLocation) -> dict:
+    return {
+        "id": visited_location.id,
+        "dateTimeOfVisitLocationPoint": visited_location.dateTimeOfVisitLocationPoint,
+        "locationPointId": visited_location.locationPointId,
+    }
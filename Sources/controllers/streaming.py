@@ -0,0 +1,16 @@
+from typing import Iterable, Iterator
+
+
+def iter_json_array(values: Iterable[int], chunk_size: int = 1000) -> Iterator[str]:
+    yield "["
+    chunk = []
+    separator = ""
+    for value in values:
+        chunk.append(str(value))
+        if len(chunk) == chunk_size:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk.clear()
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
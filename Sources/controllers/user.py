@@ -1,13 +1,20 @@
 from typing import Literal
 from sqlalchemy.orm import Session
-from fastapi.security import HTTPBasicCredentials
+from fastapi.security import HTTPBasicCredentials, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
 
 from db import models
 from models import schemas
 from db.crud import get_user
+from db.cache import account_version_cache
 from controllers.db import get_db
-from controllers.auth import security
+from controllers.auth import (
+    bearer_security,
+    read_access_token,
+    parse_basic_authorization,
+    parse_bearer_authorization,
+    security_without_auto_error,
+)
 from controllers.password import verify_password
 from controllers.validation import validate_account
 
@@ -19,9 +26,69 @@ def check_role(user_role: schemas.Role, allowed_roles: list[schemas.Role]):
 
 async def get_current_account(
     db: Session = Depends(get_db),
-    credentials: HTTPBasicCredentials = Depends(security),
+    credentials: HTTPBasicCredentials | None = Depends(security_without_auto_error),
+    bearer: HTTPAuthorizationCredentials | None = Depends(bearer_security),
 ) -> schemas.Account :
-    user = get_user(db, credentials.username)
-    if not user or not verify_password(credentials.password, user.password):  # type: ignore
+    if not credentials and not bearer:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+
+    if bearer:
+        account = authenticate_token(db, bearer.credentials)
+    else:
+        account = _authenticate_basic(db, credentials.username, credentials.password)  # type: ignore
+    if not account:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-    return validate_account(user)
+    return account
+
+
+def authenticate_authorization(
+    db: Session,
+    authorization: str | None
+) -> schemas.Account | None:
+    token = parse_bearer_authorization(authorization)
+    if token:
+        return authenticate_token(db, token)
+    credentials = parse_basic_authorization(authorization)
+    if credentials:
+        return _authenticate_basic(db, credentials.username, credentials.password)
+    return None
+
+
+def authenticate_token(db: Session, token: str) -> schemas.Account | None:
+    payload = read_access_token(token)
+    if not payload:
+        return None
+    try:
+        account_id, role, version = payload["id"], payload["role"], payload["version"]
+        role = schemas.Role(role)
+    except (KeyError, ValueError):
+        return None
+    if account_version_cache.get_version(db, account_id) != version:
+        return None
+    return schemas.Account.construct(id=account_id, role=role)
+
+
+def authenticate_account(
+    db: Session,
+    email: str,
+    password: str
+) -> models.Account | None:
+    user = get_user(db, email)
+    if not user or not verify_password(password, user.password):  # type: ignore
+        return None
+    return user
+
+
+def _authenticate_basic(
+    db: Session,
+    email: str,
+    password: str
+) -> schemas.Account | None:
+    account = authenticate_account(db, email, password)
+    if not account:
+        return None
+    return validate_account(account)
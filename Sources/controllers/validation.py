@@ -32,7 +32,7 @@ def validate_animal_type(animal_type: models.AnimalType) -> schemas.AnimalType:
 
 def validate_animal(animal: models.Animal) -> schemas.Animal:
     animal_types = _validate_animal_types(animal.animalTypes)
-    visited_locations = _validate_visited_locations(animal.visitedLocations)
+    visited_locations = _validate_visited_locations(animal)
     return schemas.Animal(
         id=animal.id,  # type: ignore
         animalTypes=animal_types,
@@ -49,18 +49,46 @@ def validate_animal(animal: models.Animal) -> schemas.Animal:
     )
 
 
+def validate_animal_with_visited_locations_slice(
+    animal: models.Animal,
+    visited_locations: schemas.VisitedLocationsSlice
+) -> schemas.AnimalWithVisitedLocationsSlice:
+    return schemas.AnimalWithVisitedLocationsSlice(
+        id=animal.id,  # type: ignore
+        animalTypes=_validate_animal_types(animal.animalTypes),
+        weight=animal.weight,  # type: ignore
+        length=animal.length,  # type: ignore
+        height=animal.height,  # type: ignore
+        gender=animal.gender,   # type: ignore
+        lifeStatus=animal.lifeStatus,  # type: ignore
+        chippingDateTime=animal.chippingDateTime,  # type: ignore
+        chipperId=animal.chipperId,  # type: ignore
+        chippingLocationId=animal.chippingLocationId,  # type: ignore
+        visitedLocations=visited_locations,
+        deathDateTime=animal.deathDateTime  # type: ignore
+    )
+
+
+def validate_visited_locations_slice(
+    visited_location_ids: list[int],
+    count: int,
+    limit: int
+) -> schemas.VisitedLocationsSlice:
+    items = visited_location_ids[:limit]
+    return schemas.VisitedLocationsSlice(
+        items=items,
+        count=count,
+        nextCursor=items[-1] if len(visited_location_ids) > limit else None
+    )
+
+
 def _validate_animal_types(animal_types: list[models.AnimalType]) -> list[int]:
     return [type.id for type in animal_types]  # type: ignore
     
 
-def _validate_visited_locations(
-    visited_locations: list[models.AnimalVisitedLocation]
-) -> list[int]:
-    sorted_visited_locations = sorted(
-        visited_locations, 
-        key=lambda loc: loc.dateTimeOfVisitLocationPoint  # type: ignore
-    )
-    return [location.id for location in sorted_visited_locations]  # type: ignore
+def _validate_visited_locations(animal: models.Animal) -> list[int]:
+    archived_ids = animal.visitArchive.ids if animal.visitArchive else []
+    return archived_ids + [location.id for location in animal.visitedLocations]  # type: ignore
 
 
 def validate_visited_location(
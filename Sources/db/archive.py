@@ -0,0 +1,96 @@
+import pytz
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from db.database import engine
+from config.config import (
+    VISITED_LOCATIONS_ARCHIVE_AFTER_DAYS,
+    VISITED_LOCATIONS_ARCHIVE_BATCH_SIZE,
+)
+
+
+# Переносит посещения старше даты из animal_visited_location в архив
+# одним запросом: массивы дописываются в конец, так как архив всегда старше
+# живых посещений, а граница по дате общая для всех посещений животного
+ARCHIVE_QUERY = """
+WITH moved AS (
+    DELETE FROM animal_visited_location
+    WHERE id_animal >= :first_animal AND id_animal < :last_animal
+        AND "dateTimeOfVisitLocationPoint" < :before
+    RETURNING id, id_animal, "locationPointId", "dateTimeOfVisitLocationPoint"
+), grouped AS (
+    SELECT
+        id_animal,
+        count(*) AS "visitCount",
+        min("dateTimeOfVisitLocationPoint") AS "firstDateTime",
+        max("dateTimeOfVisitLocationPoint") AS "lastDateTime",
+        array_agg(id ORDER BY "dateTimeOfVisitLocationPoint", id) AS ids,
+        array_agg("locationPointId" ORDER BY "dateTimeOfVisitLocationPoint", id)
+            AS "locationPointIds",
+        array_agg("dateTimeOfVisitLocationPoint" ORDER BY "dateTimeOfVisitLocationPoint", id)
+            AS "dateTimes"
+    FROM moved
+    GROUP BY id_animal
+)
+INSERT INTO animal_visit_archive AS archive (
+    id_animal, "visitCount", "firstDateTime", "lastDateTime",
+    ids, "locationPointIds", "dateTimes"
+)
+SELECT
+    id_animal, "visitCount", "firstDateTime", "lastDateTime",
+    ids, "locationPointIds", "dateTimes"
+FROM grouped
+ON CONFLICT (id_animal) DO UPDATE SET
+    "visitCount" = archive."visitCount" + excluded."visitCount",
+    "lastDateTime" = excluded."lastDateTime",
+    ids = archive.ids || excluded.ids,
+    "locationPointIds" = archive."locationPointIds" || excluded."locationPointIds",
+    "dateTimes" = archive."dateTimes" || excluded."dateTimes"
+"""
+
+
+def archive_visited_locations(
+    connection: Connection,
+    before: datetime,
+    first_animal: int,
+    last_animal: int
+) -> int:
+    return connection.execute(text(ARCHIVE_QUERY), {
+        "before": before,
+        "first_animal": first_animal,
+        "last_animal": last_animal,
+    }).rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Перенос старых посещений локаций в архив "
+                    "(запускается по расписанию, чтение архивных посещений прозрачно для API)"
+    )
+    parser.add_argument("--before", type=datetime.fromisoformat,
+                        help="Архивировать посещения раньше этого момента "
+                             f"(по умолчанию {VISITED_LOCATIONS_ARCHIVE_AFTER_DAYS} дней назад)")
+    parser.add_argument("--batch-size", type=int, default=VISITED_LOCATIONS_ARCHIVE_BATCH_SIZE,
+                        help="Количество животных в одной транзакции")
+    args = parser.parse_args()
+
+    before = args.before or (
+        datetime.now(tz=pytz.UTC) - timedelta(days=VISITED_LOCATIONS_ARCHIVE_AFTER_DAYS))
+    if before.tzinfo is None:
+        before = before.replace(tzinfo=pytz.UTC)
+
+    with engine.connect() as connection:
+        max_animal = connection.exec_driver_sql("SELECT max(id) FROM animal").scalar() or 0
+
+    archived = 0
+    for first_animal in range(1, max_animal + 1, args.batch_size):
+        with engine.begin() as connection:
+            archived += archive_visited_locations(
+                connection, before, first_animal, first_animal + args.batch_size)
+    print(f"Archived visits of {archived} animals before {before.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
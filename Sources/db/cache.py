@@ -0,0 +1,144 @@
+import logging
+import select
+from time import monotonic
+from threading import Event, Lock, Thread
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db import models
+from config.config import ANIMAL_TYPE_CACHE_TTL, ACCOUNT_VERSION_CACHE_TTL, DB_PGBOUNCER
+
+
+logger = logging.getLogger(__name__)
+
+# Канал, в который create/update/delete типа пишут NOTIFY в своей транзакции
+ANIMAL_TYPE_CHANNEL = "animal_type_changed"
+
+LISTEN_RETRY_INTERVAL = 5
+
+
+class AnimalTypeCache:
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._lock = Lock()
+        self._generation = 0
+        self._loaded_at = 0.0
+        self._snapshot: tuple[dict[int, str], dict[str, int]] | None = None
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    def warm(self, db: Session):
+        self._load(db)
+
+    def start_listening(self, engine: Engine):
+        # Кэш свой у каждого воркера gunicorn: изменения типов в других воркерах
+        # приходят через LISTEN/NOTIFY, TTL остаётся страховкой на случай обрыва
+        if DB_PGBOUNCER or engine.dialect.driver != "psycopg2":
+            # PgBouncer в режиме transaction не доставляет уведомления
+            logger.warning("Animal type cache invalidation is unavailable, relying on TTL")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._listen, args=(engine,), name="animal-type-listener", daemon=True)
+        self._thread.start()
+
+    def stop_listening(self):
+        self._stopped.set()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def get_types(self, db: Session) -> dict[int, str]:
+        return self._get_snapshot(db)[0]
+
+    # Промах идёт в БД: тип мог появиться в другом воркере раньше уведомления
+    def get_types_by_ids(self, db: Session, type_ids: list[int]) -> dict[int, str]:
+        types = self.get_types(db)
+        found = {type_id: types[type_id] for type_id in type_ids if type_id in types}
+        missing = set(type_ids) - found.keys()
+        if missing:
+            rows = db.query(models.AnimalType.id, models.AnimalType.type).filter(
+                models.AnimalType.id.in_(missing)
+            ).all()
+            found.update({row.id: row.type for row in rows})
+        return found
+
+    def get_id(self, db: Session, type: str) -> int | None:
+        type_id = self._get_snapshot(db)[1].get(type)
+        if type_id is None:
+            type_id = db.query(models.AnimalType.id).filter(
+                models.AnimalType.type == type
+            ).scalar()
+        return type_id
+
+    def _get_snapshot(self, db: Session) -> tuple[dict[int, str], dict[str, int]]:
+        snapshot = self._snapshot
+        if snapshot is None or monotonic() - self._loaded_at > self._ttl:
+            snapshot = self._load(db)
+        return snapshot
+
+    def _load(self, db: Session) -> tuple[dict[int, str], dict[str, int]]:
+        generation = self._generation
+        rows = db.query(models.AnimalType.id, models.AnimalType.type).all()
+        snapshot = (
+            {row.id: row.type for row in rows},
+            {row.type: row.id for row in rows},
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._loaded_at = monotonic()
+        return snapshot
+
+    def _listen(self, engine: Engine):
+        while not self._stopped.is_set():
+            try:
+                # Отдельное соединение вне пула: оно занято LISTEN всё время работы
+                args, kwargs = engine.dialect.create_connect_args(engine.url)
+                connection = engine.dialect.connect(*args, **kwargs)
+                try:
+                    connection.autocommit = True
+                    connection.cursor().execute(f"LISTEN {ANIMAL_TYPE_CHANNEL}")
+                    # Уведомления до LISTEN потеряны, поэтому снимок перечитывается
+                    self.invalidate()
+                    while not self._stopped.is_set():
+                        if not select.select([connection], [], [], 1)[0]:
+                            continue
+                        connection.poll()
+                        if connection.notifies:
+                            connection.notifies.clear()
+                            self.invalidate()
+                finally:
+                    connection.close()
+            except Exception:
+                logger.warning("Animal type listener failed", exc_info=True)
+                self.invalidate()
+                self._stopped.wait(LISTEN_RETRY_INTERVAL)
+
+
+class AccountVersionCache:
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._versions: dict[int, tuple[int | None, float]] = {}
+
+    def invalidate(self, account_id: int):
+        self._versions.pop(account_id, None)
+
+    def get_version(self, db: Session, account_id: int) -> int | None:
+        cached = self._versions.get(account_id)
+        if cached is not None and monotonic() - cached[1] <= self._ttl:
+            return cached[0]
+
+        version = db.query(models.Account.version).filter(
+            models.Account.id == account_id).scalar()
+        self._versions[account_id] = (version, monotonic())
+        return version
+
+
+animal_type_cache = AnimalTypeCache(ANIMAL_TYPE_CACHE_TTL)
+
+account_version_cache = AccountVersionCache(ACCOUNT_VERSION_CACHE_TTL)
@@ -1,10 +1,17 @@
+import pytz
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, exists, and_, or_, not_, cast, Date, func
-from datetime import date
+from sqlalchemy.orm import Session, Query, selectinload, load_only, undefer_group
+from sqlalchemy.engine import Row
+from sqlalchemy import (
+    Column, Integer, exists, and_, or_, not_, func, insert, tuple_,
+    select, true, Table, case, text
+)
+from datetime import date, datetime, time, timedelta
 
 from db import models
 from models import schemas
+from db.cache import animal_type_cache, account_version_cache, ANIMAL_TYPE_CHANNEL
+from config.config import SEARCH_COUNT_EXACT_THRESHOLD
 
 
 # Account ---------------------------------------------------------------------
@@ -49,6 +56,13 @@ def exists_account_with_id(db: Session, id: int | Column[Integer]) -> bool:
     return db.query(exists().where(models.Account.id==id)).scalar()    
 
 
+def get_existing_account_ids(db: Session, account_ids: list[int]) -> set[int]:
+    rows = db.query(models.Account.id).filter(
+        models.Account.id.in_(account_ids)
+    ).all()
+    return {row.id for row in rows}
+
+
 def get_user(db: Session, email: str) -> models.Account | None:
     return db.query(models.Account).filter(models.Account.email==email).first()
 
@@ -63,6 +77,19 @@ def get_accounts(
     skip: int,
     size: int
 ) -> list[models.Account] | list[None]:
+    return _get_accounts_query(db, data).order_by(
+        models.Account.id).offset(skip).limit(size).all()
+
+
+def count_accounts(
+    db: Session,
+    data: schemas.AccountSearch,
+    mode: schemas.CountMode
+) -> int:
+    return _count(db, _get_accounts_query(db, data), models.Account, mode)
+
+
+def _get_accounts_query(db: Session, data: schemas.AccountSearch) -> Query:
     dct = {
         0: models.Account.firstName,
         1: models.Account.lastName,
@@ -70,8 +97,7 @@ def get_accounts(
     }
     args = (data.firstName, data.lastName, data.email)
     lst = [dct[i].ilike(f"%{arg}%") for i, arg in enumerate(args) if arg]
-    return db.query(models.Account).filter(and_(*lst)).order_by(
-        models.Account.id).offset(skip).limit(size).all()
+    return db.query(models.Account).filter(and_(*lst))
 
 
 def update_account(
@@ -85,11 +111,13 @@ def update_account(
             models.Account.lastName: user_data.lastName,
             models.Account.email: user_data.email,
             models.Account.password: user_data.password,
-            models.Account.role: user_data.role
+            models.Account.role: user_data.role,
+            models.Account.version: models.Account.version + 1
         },
         synchronize_session=False
     )
     db.commit()
+    account_version_cache.invalidate(account_id)  # type: ignore
 
 
 def delete_account(
@@ -98,6 +126,7 @@ def delete_account(
 ):
     db.query(models.Account).filter(models.Account.id==account_id).delete()
     db.commit()
+    account_version_cache.invalidate(account_id)  # type: ignore
 
 
 def is_account_linked_with_animals(
@@ -117,6 +146,17 @@ def get_location_point(
     ).first()
 
 
+def get_location_points_by_ids(
+    db: Session,
+    point_ids: list[int]
+) -> list[models.LocationPoint]:
+    location_points = db.query(models.LocationPoint).filter(
+        models.LocationPoint.id.in_(point_ids)
+    ).all()
+    location_points_by_id = {point.id: point for point in location_points}
+    return [location_points_by_id[id] for id in point_ids if id in location_points_by_id]
+
+
 def get_location_point_by_coords(
     db: Session,
     coords: schemas.LocationPointBase
@@ -127,6 +167,15 @@ def get_location_point_by_coords(
     ).first()
 
 
+def get_location_point_version(
+    db: Session,
+    point_id: int | Column[Integer]
+) -> int | None:
+    return db.query(models.LocationPoint.version).filter(
+        models.LocationPoint.id == point_id
+    ).scalar()
+
+
 def exists_location_point_with_latitude_and_longitude(
     db: Session, 
     location_point: schemas.LocationPointBase
@@ -141,15 +190,26 @@ def exists_location_point_with_id(db: Session, point_id: int) -> bool:
     return db.query(exists().where(models.LocationPoint.id == point_id)).scalar()
 
 
+def get_existing_location_point_ids(
+    db: Session,
+    point_ids: list[int]
+) -> set[int]:
+    rows = db.query(models.LocationPoint.id).filter(
+        models.LocationPoint.id.in_(point_ids)
+    ).all()
+    return {row.id for row in rows}
+
+
 def is_point_used_as_chipping(db: Session, point_id: int) -> bool:
     return db.query(
         exists().where(models.Animal.chippingLocationId == point_id)).scalar()
 
 
 def is_point_used_as_visited(db: Session, point_id: int) -> bool:
-    return db.query(
-        exists().where(models.AnimalVisitedLocation.locationPointId == point_id)
-    ).scalar()
+    return db.query(or_(
+        exists().where(models.AnimalVisitedLocation.locationPointId == point_id),
+        exists().where(models.AnimalVisitArchive.locationPointIds.contains([point_id])),
+    )).scalar()
 
 
 def create_location_point(
@@ -176,7 +236,8 @@ def update_location_point(
     ).update(
         {
             models.LocationPoint.latitude: location_point.latitude,
-            models.LocationPoint.longitude: location_point.longitude
+            models.LocationPoint.longitude: location_point.longitude,
+            models.LocationPoint.version: models.LocationPoint.version + 1
         },
         synchronize_session=False
     )
@@ -191,9 +252,7 @@ def is_location_point_linked_with_animals(
         models.Animal.chippingLocationId == point_id
     )).scalar()
 
-    animals_visited_locations_link = db.query(exists().where(
-        models.AnimalVisitedLocation.locationPointId == point_id
-    )).scalar()
+    animals_visited_locations_link = is_point_used_as_visited(db, point_id)  # type: ignore
 
     return any((animals_link, animals_visited_locations_link))
 
@@ -206,26 +265,47 @@ def delete_location_point(db: Session, point_id: int | Column[Integer]):
 
 
 # AnimalTypes -----------------------------------------------------------------
+# Типы читаются из кэша процесса; изменения в других воркерах приходят
+# через NOTIFY, а промах кэша проверяется в БД
 def get_animal_type(
     db: Session,
     type_id: int | Column[Integer]
 ) -> models.AnimalType | None:
-    return db.query(models.AnimalType).filter(
-        models.AnimalType.id == type_id
-    ).first()
+    type = animal_type_cache.get_types_by_ids(db, [type_id]).get(type_id)  # type: ignore
+    if type is None:
+        return None
+    return models.AnimalType(id=type_id, type=type)
+
+
+def get_animal_types_by_ids(
+    db: Session,
+    type_ids: list[int]
+) -> list[models.AnimalType]:
+    types = animal_type_cache.get_types_by_ids(db, type_ids)
+    return [
+        models.AnimalType(id=type_id, type=types[type_id])
+        for type_id in type_ids if type_id in types
+    ]
 
 
 def exists_animal_type_with_type(
     db: Session, 
     animal_type: schemas.AnimalTypeBase
 ) -> bool:
-    return db.query(exists().where(
-        models.AnimalType.type == animal_type.type,
-    )).scalar()    
+    return animal_type_cache.get_id(db, animal_type.type) is not None
 
 
 def exists_animal_type_with_id(db: Session, type_id: int) -> bool:
-    return db.query(exists().where(models.AnimalType.id == type_id)).scalar()
+    return type_id in animal_type_cache.get_types_by_ids(db, [type_id])
+
+
+def get_existing_animal_type_ids(db: Session, type_ids: list[int]) -> set[int]:
+    return set(animal_type_cache.get_types_by_ids(db, type_ids))
+
+
+def _notify_animal_types_changed(db: Session):
+    # Доставляется другим воркерам только после коммита транзакции
+    db.execute(text(f"NOTIFY {ANIMAL_TYPE_CHANNEL}"))
 
 
 def create_animal_type(
@@ -234,7 +314,9 @@ def create_animal_type(
 ) -> models.AnimalType:
     db_animal_type = models.AnimalType(type=animal_type.type)
     db.add(db_animal_type)
+    _notify_animal_types_changed(db)
     db.commit()
+    animal_type_cache.invalidate()
     db.refresh(db_animal_type)
     return db_animal_type
 
@@ -250,7 +332,9 @@ def update_animal_type(
         },
         synchronize_session=False
     )
+    _notify_animal_types_changed(db)
     db.commit()
+    animal_type_cache.invalidate()
 
 
 def is_animal_type_linked_with_animals(db: Session, type_id: int) -> bool:
@@ -261,7 +345,9 @@ def is_animal_type_linked_with_animals(db: Session, type_id: int) -> bool:
 
 def delete_animal_type(db: Session, type_id: int | Column[Integer]):
     db.query(models.AnimalType).filter(models.AnimalType.id == type_id).delete()
+    _notify_animal_types_changed(db)
     db.commit()
+    animal_type_cache.invalidate()
 
 
 # Animal ----------------------------------------------------------------------
@@ -269,12 +355,96 @@ def get_animal(db: Session, animal_id: int | Column[Integer]) -> models.Animal |
     return db.query(models.Animal).filter(models.Animal.id==animal_id).first()
 
 
+def get_animal_version(db: Session, animal_id: int | Column[Integer]) -> int | None:
+    return db.query(models.Animal.version).filter(
+        models.Animal.id == animal_id
+    ).scalar()
+
+
+def _allocate_ids(db: Session, table: Table, count: int) -> list[int]:
+    # Порядок строк RETURNING у многострочного INSERT не гарантирован, поэтому
+    # id берутся из последовательности заранее и связываются с входными данными
+    # явно; по возрастанию, чтобы посещения с одинаковым временем шли по порядку
+    return sorted(db.execute(
+        select(func.nextval(func.pg_get_serial_sequence(table.name, "id")))
+        .select_from(func.generate_series(1, count))
+    ).scalars())
+
+
+def _bump_animal_versions(db: Session, *animal_ids: int | Column[int]):
+    db.query(models.Animal).filter(models.Animal.id.in_(animal_ids)).update(
+        {models.Animal.version: models.Animal.version + 1},
+        synchronize_session=False
+    )
+
+
+def _bump_animal_version_of_visited_location(db: Session, loc_id: int | Column[int]):
+    db.query(models.Animal).filter(
+        models.Animal.id == select(models.AnimalVisitedLocation.id_animal).where(
+            models.AnimalVisitedLocation.id == loc_id
+        ).scalar_subquery()
+    ).update(
+        {models.Animal.version: models.Animal.version + 1},
+        synchronize_session=False
+    )
+
+
+def _get_animal_load_options(fields: list[str] | None) -> list:
+    if fields is None:
+        return [
+            selectinload(models.Animal.animalTypes),
+            selectinload(models.Animal.visitedLocations),
+            selectinload(models.Animal.visitArchive).load_only(models.AnimalVisitArchive.ids),
+        ]
+
+    columns = [
+        getattr(models.Animal, field) for field in fields
+        if field not in ("animalTypes", "visitedLocations")
+    ]
+    options = [load_only(models.Animal.id, *columns)]
+    if "animalTypes" in fields:
+        options.append(selectinload(models.Animal.animalTypes))
+    if "visitedLocations" in fields:
+        options.append(selectinload(models.Animal.visitedLocations).load_only(
+            models.AnimalVisitedLocation.id))
+        options.append(selectinload(models.Animal.visitArchive).load_only(
+            models.AnimalVisitArchive.ids))
+    return options
+
+
+def get_animals_by_ids(
+    db: Session,
+    animal_ids: list[int],
+    fields: list[str] | None = None
+) -> list[models.Animal]:
+    animals = db.query(models.Animal).options(
+        *_get_animal_load_options(fields)
+    ).filter(models.Animal.id.in_(animal_ids)).all()
+    animals_by_id = {animal.id: animal for animal in animals}
+    return [animals_by_id[id] for id in animal_ids if id in animals_by_id]
+
+
 def get_animals(
     db: Session,
     data: schemas.AnimalSearch,
     skip: int,
-    size: int
+    size: int,
+    fields: list[str] | None = None
 ) -> list[models.Animal] | list[None]:
+    return _get_animals_query(db, data).options(
+        *_get_animal_load_options(fields)
+    ).order_by(models.Animal.id).offset(skip).limit(size).all()
+
+
+def count_animals(
+    db: Session,
+    data: schemas.AnimalSearch,
+    mode: schemas.CountMode
+) -> int:
+    return _count(db, _get_animals_query(db, data), models.Animal, mode)
+
+
+def _get_animals_query(db: Session, data: schemas.AnimalSearch) -> Query:
     datetime_comprasion = []
     if data.startDateTime:
         datetime_comprasion.append(
@@ -295,7 +465,7 @@ def get_animals(
     return db.query(models.Animal).filter(
         and_(*datetime_comprasion),  # type: ignore
         and_(*args_equality)
-    ).order_by(models.Animal.id).offset(skip).limit(size).all()
+    )
 
 
 def create_animal(db: Session, animal: schemas.AnimalCreation) -> models.Animal:
@@ -315,6 +485,35 @@ def create_animal(db: Session, animal: schemas.AnimalCreation) -> models.Animal:
     return db_animal
 
 
+def create_animals(
+    db: Session,
+    animals: list[schemas.AnimalCreation]
+) -> list[models.Animal]:
+    animal_ids = _allocate_ids(db, models.Animal.__table__, len(animals))  # type: ignore
+    db.execute(
+        insert(models.Animal).values([
+            {
+                "id": animal_id,
+                "weight": animal.weight,
+                "length": animal.length,
+                "height": animal.height,
+                "gender": animal.gender,
+                "chipperId": animal.chipperId,
+                "chippingLocationId": animal.chippingLocationId,
+            }
+            for animal_id, animal in zip(animal_ids, animals)
+        ])
+    )
+
+    db.execute(insert(models.AnimalTypeAnimal).values([
+        {"id_animal": animal_id, "id_animal_type": type_id}
+        for animal_id, animal in zip(animal_ids, animals)
+        for type_id in animal.animalTypes
+    ]))
+    db.commit()
+    return get_animals_by_ids(db, animal_ids)
+
+
 def create_animalType_animal_connection(
     db: Session,
     animal_id: int | Column[int],
@@ -325,6 +524,7 @@ def create_animalType_animal_connection(
         id_animal_type = type_id
     )
     db.add(connection)
+    _bump_animal_versions(db, animal_id)
     db.commit()
 
 
@@ -339,6 +539,7 @@ def update_animal(db: Session, animal_id: int, data: schemas.AnimalUpdate):
             models.Animal.deathDateTime: data.deathDateTime,
             models.Animal.chipperId: data.chipperId,
             models.Animal.chippingLocationId: data.chippingLocationId,
+            models.Animal.version: models.Animal.version + 1,
         },
         synchronize_session=False
     )
@@ -379,6 +580,7 @@ def update_animal_type_of_animal(
         },
         synchronize_session=False
     )
+    _bump_animal_versions(db, animal_id)
     db.commit()
 
 
@@ -397,6 +599,7 @@ def delete_animal_type_of_animal(
         models.AnimalTypeAnimal.id_animal == animal_id,
         models.AnimalTypeAnimal.id_animal_type == type_id,
     ).delete()
+    _bump_animal_versions(db, animal_id)
     db.commit()
 
 
@@ -416,12 +619,133 @@ def get_visited_locastions(
         datetime_comprasion.append(
             models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint <= data.endDateTime
         )
-    return db.query(models.AnimalVisitedLocation).filter(
+    archived_visits = [
+        visit for visit in get_archived_visited_locations(
+            get_visit_archive(db, animal_id, data.startDateTime, data.endDateTime))
+        if (not data.startDateTime
+            or visit.dateTimeOfVisitLocationPoint >= data.startDateTime)
+        and (not data.endDateTime
+            or visit.dateTimeOfVisitLocationPoint <= data.endDateTime)
+    ]
+    visited_locations = archived_visits[skip:skip + size]
+    if len(visited_locations) == size:
+        return visited_locations
+
+    return visited_locations + db.query(models.AnimalVisitedLocation).filter(
         models.AnimalVisitedLocation.id_animal == animal_id,
         and_(*datetime_comprasion),
     ).order_by(
         models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint
-    ).offset(skip).limit(size).all()
+    ).offset(max(skip - len(archived_visits), 0)).limit(
+        size - len(visited_locations)).all()
+
+
+def get_visited_location_ids(
+    db: Session,
+    animal_id: int | Column[int],
+    after: models.AnimalVisitedLocation | None,
+    limit: int
+) -> list[int]:
+    keyset = []
+    if after:
+        keyset.append(tuple_(
+            models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+            models.AnimalVisitedLocation.id
+        ) > tuple_(after.dateTimeOfVisitLocationPoint, after.id))
+    archived_ids = [
+        visit.id for visit in get_archived_visited_locations(get_visit_archive(
+            db, animal_id, after.dateTimeOfVisitLocationPoint if after else None))
+        if not after or (visit.dateTimeOfVisitLocationPoint, visit.id)
+            > (after.dateTimeOfVisitLocationPoint, after.id)
+    ][:limit]
+    if len(archived_ids) == limit:
+        return archived_ids
+
+    rows = db.query(models.AnimalVisitedLocation.id).filter(
+        models.AnimalVisitedLocation.id_animal == animal_id,
+        *keyset
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+        models.AnimalVisitedLocation.id
+    ).limit(limit - len(archived_ids)).all()
+    return archived_ids + [row.id for row in rows]
+
+
+def get_visited_location_ids_of_animals(
+    db: Session,
+    animal_ids: list[int],
+    limit: int
+) -> dict[int, list[int]]:
+    animals = select(models.Animal.id).where(
+        models.Animal.id.in_(animal_ids)
+    ).subquery()
+    visits = select(models.AnimalVisitedLocation.id).where(
+        models.AnimalVisitedLocation.id_animal == animals.c.id
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+        models.AnimalVisitedLocation.id
+    ).limit(limit).lateral()
+
+    archives = db.query(
+        models.AnimalVisitArchive.id_animal, models.AnimalVisitArchive.ids
+    ).filter(models.AnimalVisitArchive.id_animal.in_(animal_ids)).all()
+    visited_location_ids = {animal_id: [] for animal_id in animal_ids}
+    for archive in archives:
+        visited_location_ids[archive.id_animal] = archive.ids[:limit]
+
+    rows = db.query(animals.c.id.label("id_animal"), visits.c.id).join(
+        visits, true()).all()
+    for row in rows:
+        if len(visited_location_ids[row.id_animal]) < limit:
+            visited_location_ids[row.id_animal].append(row.id)
+    return visited_location_ids
+
+
+def count_visited_locations(db: Session, animal_id: int | Column[int]) -> int:
+    live_count = select(func.count()).where(
+        models.AnimalVisitedLocation.id_animal == animal_id
+    ).scalar_subquery()
+    archived_count = select(models.AnimalVisitArchive.visitCount).where(
+        models.AnimalVisitArchive.id_animal == animal_id
+    ).scalar_subquery()
+    return db.scalar(select(live_count + func.coalesce(archived_count, 0)))  # type: ignore
+
+
+def count_visited_locations_of_animals(
+    db: Session,
+    animal_ids: list[int]
+) -> dict[int, int]:
+    rows = db.query(
+        models.AnimalVisitedLocation.id_animal,
+        func.count(models.AnimalVisitedLocation.id).label("count")
+    ).filter(
+        models.AnimalVisitedLocation.id_animal.in_(animal_ids)
+    ).group_by(models.AnimalVisitedLocation.id_animal).all()
+    archives = db.query(
+        models.AnimalVisitArchive.id_animal, models.AnimalVisitArchive.visitCount
+    ).filter(models.AnimalVisitArchive.id_animal.in_(animal_ids)).all()
+    counts = {row.id_animal: row.count for row in rows}
+    archived_counts = {archive.id_animal: archive.visitCount for archive in archives}
+    return {
+        animal_id: counts.get(animal_id, 0) + archived_counts.get(animal_id, 0)
+        for animal_id in animal_ids
+    }
+
+
+def iter_visited_location_ids(db: Session, animal_id: int | Column[int]):
+    archived_ids = db.query(models.AnimalVisitArchive.ids).filter(
+        models.AnimalVisitArchive.id_animal == animal_id
+    ).scalar()
+    yield from archived_ids or []
+
+    rows = db.query(models.AnimalVisitedLocation.id).filter(
+        models.AnimalVisitedLocation.id_animal == animal_id
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+        models.AnimalVisitedLocation.id
+    ).yield_per(1000)
+    for row in rows:
+        yield row.id
 
 
 def create_animal_visited_location(
@@ -434,11 +758,66 @@ def create_animal_visited_location(
         locationPointId = point_id,
     )
     db.add(db_visited_location)
+    _bump_animal_versions(db, animal_id)
     db.commit()
     db.refresh(db_visited_location)
     return db_visited_location
 
 
+def create_animal_visited_locations(
+    db: Session,
+    visited_locations: list[dict]
+) -> list[int]:
+    ids = _allocate_ids(
+        db, models.AnimalVisitedLocation.__table__, len(visited_locations))  # type: ignore
+    db.execute(insert(models.AnimalVisitedLocation).values([
+        {"id": id, **visited_location}
+        for id, visited_location in zip(ids, visited_locations)
+    ]))
+    _bump_animal_versions(
+        db, *{visited_location["id_animal"] for visited_location in visited_locations})
+    db.commit()
+    return ids
+
+
+def get_animals_with_last_visited_location(
+    db: Session,
+    animal_ids: list[int]
+) -> list[Row]:
+    last_visits = db.query(
+        models.AnimalVisitedLocation.id_animal,
+        models.AnimalVisitedLocation.locationPointId,
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+    ).filter(
+        models.AnimalVisitedLocation.id_animal.in_(animal_ids)
+    ).distinct(
+        models.AnimalVisitedLocation.id_animal
+    ).order_by(
+        models.AnimalVisitedLocation.id_animal,
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint.desc(),
+        models.AnimalVisitedLocation.id.desc(),
+    ).subquery()
+
+    archive = models.AnimalVisitArchive
+    return db.query(
+        models.Animal.id,
+        models.Animal.lifeStatus,
+        models.Animal.chippingLocationId,
+        func.coalesce(
+            last_visits.c.locationPointId,
+            archive.locationPointIds[archive.visitCount]
+        ).label("lastLocationPointId"),
+        func.coalesce(
+            last_visits.c.dateTimeOfVisitLocationPoint,
+            archive.lastDateTime
+        ).label("lastDateTimeOfVisit"),
+    ).outerjoin(
+        last_visits, models.Animal.id == last_visits.c.id_animal
+    ).outerjoin(
+        archive, models.Animal.id == archive.id_animal
+    ).filter(models.Animal.id.in_(animal_ids)).all()
+
+
 def get_visited_location(
     db: Session, 
     loc_id: int | Column[int],
@@ -448,6 +827,79 @@ def get_visited_location(
     ).first()
 
 
+def get_previous_visited_location(
+    db: Session,
+    visited_location: models.AnimalVisitedLocation
+) -> models.AnimalVisitedLocation | None:
+    previous_location = db.query(models.AnimalVisitedLocation).filter(
+        models.AnimalVisitedLocation.id_animal == visited_location.id_animal,
+        tuple_(
+            models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+            models.AnimalVisitedLocation.id
+        ) < tuple_(
+            visited_location.dateTimeOfVisitLocationPoint,
+            visited_location.id
+        )
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint.desc(),
+        models.AnimalVisitedLocation.id.desc()
+    ).first()
+    if previous_location:
+        return previous_location
+    return _get_archived_visited_location_at(
+        db, visited_location.id_animal, models.AnimalVisitArchive.visitCount)
+
+
+def get_next_visited_location(
+    db: Session,
+    visited_location: models.AnimalVisitedLocation
+) -> models.AnimalVisitedLocation | None:
+    return db.query(models.AnimalVisitedLocation).filter(
+        models.AnimalVisitedLocation.id_animal == visited_location.id_animal,
+        tuple_(
+            models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+            models.AnimalVisitedLocation.id
+        ) > tuple_(
+            visited_location.dateTimeOfVisitLocationPoint,
+            visited_location.id
+        )
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+        models.AnimalVisitedLocation.id
+    ).first()
+
+
+def get_first_visited_location(
+    db: Session,
+    animal_id: int | Column[int]
+) -> models.AnimalVisitedLocation | None:
+    first_location = _get_archived_visited_location_at(db, animal_id, 1)
+    if first_location:
+        return first_location
+    return db.query(models.AnimalVisitedLocation).filter(
+        models.AnimalVisitedLocation.id_animal == animal_id
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint,
+        models.AnimalVisitedLocation.id
+    ).first()
+
+
+def get_last_visited_location(
+    db: Session,
+    animal_id: int | Column[int]
+) -> models.AnimalVisitedLocation | None:
+    last_location = db.query(models.AnimalVisitedLocation).filter(
+        models.AnimalVisitedLocation.id_animal == animal_id
+    ).order_by(
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint.desc(),
+        models.AnimalVisitedLocation.id.desc()
+    ).first()
+    if last_location:
+        return last_location
+    return _get_archived_visited_location_at(
+        db, animal_id, models.AnimalVisitArchive.visitCount)
+
+
 def update_visited_location(db: Session, data: schemas.AnimalVisitedLocationChange):
     db.query(models.AnimalVisitedLocation).filter(
         models.AnimalVisitedLocation.id == data.visitedLocationPointId
@@ -457,25 +909,159 @@ def update_visited_location(db: Session, data: schemas.AnimalVisitedLocationChan
         },
         synchronize_session=False
     )
+    _bump_animal_version_of_visited_location(db, data.visitedLocationPointId)
     db.commit()
 
 
 def delete_visited_location(db: Session, loc_id: int | Column[int]):
+    _bump_animal_version_of_visited_location(db, loc_id)
     db.query(models.AnimalVisitedLocation).filter(
         models.AnimalVisitedLocation.id == loc_id
     ).delete()
     db.commit()
 
 
+# Visited location archive ----------------------------------------------------
+# Архивные посещения только читаются: их возвращают как несвязанные с сессией
+# объекты AnimalVisitedLocation, и они всегда предшествуют живым посещениям
+def get_visit_archive(
+    db: Session,
+    animal_id: int | Column[int],
+    since: datetime | None = None,
+    until: datetime | None = None
+) -> models.AnimalVisitArchive | None:
+    query = db.query(models.AnimalVisitArchive).options(
+        undefer_group("visits")
+    ).filter(models.AnimalVisitArchive.id_animal == animal_id)
+    if since is not None:
+        query = query.filter(models.AnimalVisitArchive.lastDateTime >= since)
+    if until is not None:
+        query = query.filter(models.AnimalVisitArchive.firstDateTime <= until)
+    return query.first()
+
+
+def get_archived_visited_locations(
+    archive: models.AnimalVisitArchive | None
+) -> list[models.AnimalVisitedLocation]:
+    if archive is None:
+        return []
+    return [
+        models.AnimalVisitedLocation(
+            id=id,
+            id_animal=archive.id_animal,
+            locationPointId=point_id,
+            dateTimeOfVisitLocationPoint=date_time,
+        )
+        for id, point_id, date_time in zip(
+            archive.ids, archive.locationPointIds, archive.dateTimes)  # type: ignore
+    ]
+
+
+def get_archived_visited_location(
+    db: Session,
+    animal_id: int | Column[int],
+    loc_id: int | Column[int]
+) -> models.AnimalVisitedLocation | None:
+    archive = db.query(models.AnimalVisitArchive).options(
+        undefer_group("visits")
+    ).filter(
+        models.AnimalVisitArchive.id_animal == animal_id,
+        models.AnimalVisitArchive.ids.contains([loc_id]),
+    ).first()
+    for visited_location in get_archived_visited_locations(archive):
+        if visited_location.id == loc_id:
+            return visited_location
+    return None
+
+
+def _get_archived_visited_location_at(
+    db: Session,
+    animal_id: int | Column[int],
+    position
+) -> models.AnimalVisitedLocation | None:
+    row = db.query(
+        models.AnimalVisitArchive.ids[position].label("id"),
+        models.AnimalVisitArchive.locationPointIds[position].label("locationPointId"),
+        models.AnimalVisitArchive.dateTimes[position].label("dateTime"),
+    ).filter(models.AnimalVisitArchive.id_animal == animal_id).first()
+    if row is None:
+        return None
+    return models.AnimalVisitedLocation(
+        id=row.id,
+        id_animal=animal_id,
+        locationPointId=row.locationPointId,
+        dateTimeOfVisitLocationPoint=row.dateTime,
+    )
+
+
+def _get_archives_in_interval(
+    db: Session,
+    start: datetime | None,
+    end: datetime
+) -> list[models.AnimalVisitArchive]:
+    query = db.query(models.AnimalVisitArchive).options(
+        undefer_group("visits")
+    ).filter(models.AnimalVisitArchive.firstDateTime < end)
+    if start is not None:
+        query = query.filter(models.AnimalVisitArchive.lastDateTime >= start)
+    return query.all()
+
+
+def _load_location_points(
+    db: Session,
+    visited_locations: list[models.AnimalVisitedLocation]
+):
+    location_points = {
+        location_point.id: location_point for location_point in get_location_points_by_ids(
+            db, list({visit.locationPointId for visit in visited_locations}))  # type: ignore
+    }
+    for visited_location in visited_locations:
+        visited_location.location_point = location_points[visited_location.locationPointId]
+
+
 # Area ------------------------------------------------------------------------
-def get_area(db: Session, id: int | Column[int]) -> models.Area | None:
-    return db.query(models.Area).filter(models.Area.id == id).first()
+def _get_area_load_options(fields: list[str] | None) -> list:
+    if fields is None:
+        return [selectinload(models.Area.areaPoints)]
+
+    columns = [getattr(models.Area, field) for field in fields if field != "areaPoints"]
+    options = [load_only(models.Area.id, *columns)]
+    if "areaPoints" in fields:
+        options.append(selectinload(models.Area.areaPoints))
+    return options
+
+
+def get_area(
+    db: Session,
+    id: int | Column[int],
+    fields: list[str] | None = None
+) -> models.Area | None:
+    query = db.query(models.Area).filter(models.Area.id == id)
+    if fields is not None:
+        query = query.options(*_get_area_load_options(fields))
+    return query.first()
+
+
+def get_areas_by_ids(
+    db: Session,
+    area_ids: list[int],
+    fields: list[str] | None = None
+) -> list[models.Area]:
+    areas = db.query(models.Area).options(
+        *_get_area_load_options(fields)
+    ).filter(models.Area.id.in_(area_ids)).all()
+    areas_by_id = {area.id: area for area in areas}
+    return [areas_by_id[id] for id in area_ids if id in areas_by_id]
 
 
 def get_all_areas(db: Session) -> list[models.Area] | None:
     return db.query(models.Area).all()
 
 
+def get_area_version(db: Session, id: int | Column[int]) -> int | None:
+    return db.query(models.Area.version).filter(models.Area.id == id).scalar()
+
+
 def get_area_by_name(db: Session, name: str) -> models.Area | None:
     return db.query(models.Area).filter(models.Area.name == name).first()
 
@@ -519,6 +1105,12 @@ def update_area(db: Session, id: int | Column[int], data: schemas.AreaUpdate):
     for point in data.areaPoints:
         _create_area_point(db, id, point)
 
+    db.query(models.Area).filter(models.Area.id == id).update(
+        {models.Area.version: models.Area.version + 1},
+        synchronize_session=False
+    )
+    db.commit()
+
 
 def _delete_area_points(db: Session, area_id: int | Column[int]):
     db.query(models.AreaPoints).filter(models.AreaPoints.id_area == area_id).delete()
@@ -531,46 +1123,113 @@ def delete_area(db: Session, id: int | Column[int]):
 
 
 # Area's analytics ------------------------------------------------------------
+# Границы дней сравниваются с исходным столбцом без cast, чтобы работали
+# индексы и отсечение партиций animal_visited_location
+def _get_day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=pytz.UTC)
+
+
 def get_last_visited_locations(
     db: Session, date: date) -> list[models.AnimalVisitedLocation] | None:
     subq = db.query(
         models.AnimalVisitedLocation.id_animal.label("id_animal"), 
         func.max(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint).label("max_date")
     ).filter(
-        cast(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint, Date) < date
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint < _get_day_start(date)
     ).group_by(models.AnimalVisitedLocation.id_animal).subquery()
 
-    return db.query(models.AnimalVisitedLocation).join(
+    last_visited_locations = db.query(models.AnimalVisitedLocation).options(
+        selectinload(models.AnimalVisitedLocation.location_point)
+    ).join(
         subq, 
         and_(models.AnimalVisitedLocation.id_animal == subq.c.id_animal, 
         models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint == subq.c.max_date)
     ).all()
 
+    # Животные без живых посещений до даты берут последнее архивное;
+    # из массивов архива читается только один нужный элемент
+    archive = models.AnimalVisitArchive
+    day_start = _get_day_start(date)
+    dates = func.unnest(archive.dateTimes).table_valued(
+        "value", with_ordinality="position").render_derived()
+    positions = db.query(
+        archive.id_animal,
+        case(
+            (archive.lastDateTime < day_start, archive.visitCount),
+            else_=select(func.max(dates.c.position)).where(
+                dates.c.value < day_start).scalar_subquery()
+        ).label("position"),
+    ).filter(
+        archive.firstDateTime < day_start,
+        ~exists().where(subq.c.id_animal == archive.id_animal),
+    ).subquery()
+    rows = db.query(
+        archive.id_animal,
+        archive.ids[positions.c.position].label("id"),
+        archive.locationPointIds[positions.c.position].label("locationPointId"),
+        archive.dateTimes[positions.c.position].label("dateTime"),
+    ).join(positions, archive.id_animal == positions.c.id_animal).all()
+
+    archived_visits = [
+        models.AnimalVisitedLocation(
+            id=row.id,
+            id_animal=row.id_animal,
+            locationPointId=row.locationPointId,
+            dateTimeOfVisitLocationPoint=row.dateTime,
+        )
+        for row in rows
+    ]
+    if not archived_visits:
+        return last_visited_locations
+    _load_location_points(db, archived_visits)
+    return archived_visits + last_visited_locations
+
 
 def get_visited_locations_per_interval(
     db: Session, 
     start_date: date,
     end_date: date
 ) -> list[models.AnimalVisitedLocation] | None:
-    return db.query(models.AnimalVisitedLocation).filter(
+    start, end = _get_day_start(start_date), _get_day_start(end_date + timedelta(days=1))
+    visited_locations = db.query(models.AnimalVisitedLocation).options(
+        selectinload(models.AnimalVisitedLocation.location_point)
+    ).filter(
         and_(
-            cast(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint, Date) >= start_date,
-            cast(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint, Date) <= end_date,
+            models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint >= start,
+            models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint < end,
             )
     ).order_by(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint).all()
 
+    archived_visits = [
+        visit
+        for archive in _get_archives_in_interval(db, start, end)
+        for visit in get_archived_visited_locations(archive)
+        if start <= visit.dateTimeOfVisitLocationPoint < end
+    ]
+    if not archived_visits:
+        return visited_locations
+    _load_location_points(db, archived_visits)
+    return sorted(
+        archived_visits + visited_locations,
+        key=lambda visit: visit.dateTimeOfVisitLocationPoint
+    )
+
 
 def get_animals_without_vis_locs_and_with_chip_loc_before_date(
     db: Session,
     date: date,
 ) -> list[models.Animal] | list[None]:
     subq = db.query(models.AnimalVisitedLocation).filter(
-        cast(models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint, Date) < date
+        models.AnimalVisitedLocation.dateTimeOfVisitLocationPoint < _get_day_start(date)
     ).subquery()
 
     return db.query(models.Animal).outerjoin(subq).filter(
         models.AnimalVisitedLocation.id_animal == None,
-        cast(models.Animal.chippingDateTime, Date) < date 
+        ~exists().where(
+            models.AnimalVisitArchive.id_animal == models.Animal.id,
+            models.AnimalVisitArchive.firstDateTime < _get_day_start(date),
+        ),
+        models.Animal.chippingDateTime < _get_day_start(date)
     ).all()
 
 
@@ -580,14 +1239,42 @@ def get_animals_with_chip_loc_per_interval(
     end_date: date,
 ) -> list[models.Animal] | list[None]:
     return db.query(models.Animal).filter(
-        cast(models.Animal.chippingDateTime, Date) >= start_date, 
-        cast(models.Animal.chippingDateTime, Date) <= end_date 
+        models.Animal.chippingDateTime >= _get_day_start(start_date),
+        models.Animal.chippingDateTime < _get_day_start(end_date + timedelta(days=1))
     ).all()
 
 
-def get_animal_types(db: Session, animal_id: int | Column[int]) -> list[models.AnimalType]:
-    subq = db.query(models.AnimalTypeAnimal).filter(
-        models.AnimalTypeAnimal.id_animal == animal_id
-    ).subquery()
+def get_animal_type_ids_of_animals(
+    db: Session,
+    animal_ids: list[int]
+) -> dict[int, list[int]]:
+    rows = db.query(models.AnimalTypeAnimal).filter(
+        models.AnimalTypeAnimal.id_animal.in_(animal_ids)
+    ).all()
+    type_ids = {animal_id: [] for animal_id in animal_ids}
+    for row in rows:
+        type_ids[row.id_animal].append(row.id_animal_type)
+    return type_ids
+
 
-    return db.query(models.AnimalType).join(subq).all()
+# Search counts ---------------------------------------------------------------
+def _count(
+    db: Session,
+    query: Query,
+    model: type[models.Base],
+    mode: schemas.CountMode
+) -> int:
+    if mode == schemas.CountMode.ESTIMATE:
+        estimate = _estimate_count(db, query)
+        if estimate >= SEARCH_COUNT_EXACT_THRESHOLD:
+            return estimate
+    return db.scalar(
+        query.statement.with_only_columns(func.count()).select_from(model))
+
+
+def _estimate_count(db: Session, query: Query) -> int:
+    statement = query.statement.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", statement.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,9 +1,90 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 
-from config.config import POSTGRESQL_CONFIG
+from config.config import (
+    POSTGRESQL_CONFIG,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_PGBOUNCER,
+    POSTGRESQL_REPLICA_CONFIGS,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_CONNECT_TIMEOUT,
+)
+from db.replicas import ReplicaRouter
+from db.instrumentation import InstrumentedQueuePool, instrument_engine
 
 
-engine = create_engine(POSTGRESQL_CONFIG, echo=False, future=True)
+def get_pool_options() -> dict:
+    if DB_PGBOUNCER:
+        # Пулом управляет PgBouncer в режиме transaction: соединение не держим
+        # между запросами и не используем подготовленные выражения
+        options: dict = {"poolclass": NullPool}
+        if make_url(POSTGRESQL_CONFIG).get_driver_name() == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+
+engine = create_engine(
+    POSTGRESQL_CONFIG,
+    echo=False,
+    future=True,
+    **get_pool_options()
+)
+
+instrument_engine(engine)
+
+def get_replica_options() -> dict:
+    # Недоступная реплика не должна задерживать проверку дольше таймаута
+    options = get_pool_options()
+    options["connect_args"] = {
+        **options.get("connect_args", {}),
+        "connect_timeout": DB_REPLICA_CONNECT_TIMEOUT,
+    }
+    return options
+
+
+replica_engines = [
+    create_engine(dsn, echo=False, future=True, **get_replica_options())
+    for dsn in POSTGRESQL_REPLICA_CONFIGS
+]
+
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+
+replica_router = ReplicaRouter(replica_engines, DB_REPLICA_CHECK_INTERVAL, DB_REPLICA_MAX_LAG)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        # Реплика выбирается один раз на сессию, чтобы все чтения запроса
+        # (версия для ETag и сам объект) видели один снимок; после первой
+        # записи сессия переключается на primary
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["bind"] = engine
+        if "bind" not in self.info:
+            self.info["bind"] = replica_router.get_engine() or engine
+        return self.info["bind"]
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if replica_engines:
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+    )
+else:
+    ReadSessionLocal = SessionLocal
@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import random
+import logging
+from threading import Lock
+from time import perf_counter, monotonic
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from controllers.metrics import (
+    db_pool_connections,
+    db_pool_events_total,
+    db_slow_queries_total,
+    db_pool_checkout_wait_seconds,
+)
+from config.config import (
+    QUERY_DEBUG_STRICT,
+    QUERY_DEBUG_REPEAT_THRESHOLD,
+    SLOW_QUERY_SAMPLE_RATE,
+    SLOW_QUERY_THRESHOLD_MS,
+    SLOW_QUERY_MAX_PER_MINUTE,
+)
+
+
+logger = logging.getLogger(__name__)
+
+slow_query_logger = logging.getLogger(f"{__name__}.slow_query")
+
+_bind_list_pattern = re.compile(r"\(%\(\w+\)s(?:, %\(\w+\)s)*\)")
+_whitespace_pattern = re.compile(r"\s+")
+
+_crud_filename = os.path.join("db", "crud.py")
+
+_explainable_statements = ("select", "with", "insert", "update", "delete")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RepeatedQueryDetected(Exception):
+    pass
+
+
+class QueryStats:
+    def __init__(self, debug: bool = False):
+        self.statements = 0
+        self.duration = 0.0
+        self.budget: int | None = None
+        self.shapes: Counter[str] | None = Counter() if debug else None
+        self.crud_durations: defaultdict[str, float] | None = None
+        self.scope: dict | None = None
+
+    def get_route(self) -> str | None:
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return route.path if route else self.scope.get("path")
+
+    def get_repeated_shapes(self) -> list[tuple[str, int]]:
+        if self.shapes is None:
+            return []
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count > QUERY_DEBUG_REPEAT_THRESHOLD
+        ]
+
+
+class RateLimiter:
+    def __init__(self, max_per_minute: int):
+        self._max_per_minute = max_per_minute
+        self._lock = Lock()
+        self._window_start = 0.0
+        self._count = 0
+
+    def acquire(self) -> bool:
+        with self._lock:
+            now = monotonic()
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._count = 0
+            if self._count >= self._max_per_minute:
+                return False
+            self._count += 1
+            return True
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+slow_query_rate_limiter = RateLimiter(SLOW_QUERY_MAX_PER_MINUTE)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            db_pool_events_total.inc(event="timeout")
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(perf_counter() - start)
+
+
+def instrument_engine(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    for pool_event in ("connect", "checkout", "invalidate"):
+        event.listen(engine.pool, pool_event, _make_pool_event_listener(pool_event))
+
+
+def _make_pool_event_listener(pool_event: str):
+    def listener(*args):
+        db_pool_events_total.inc(event=pool_event)
+    return listener
+
+
+def update_pool_metrics(engine: Engine):
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    db_pool_connections.set(pool.size(), state="size")
+    db_pool_connections.set(pool.checkedout(), state="checked_out")
+    db_pool_connections.set(pool.checkedin(), state="checked_in")
+    db_pool_connections.set(max(pool.overflow(), 0), state="overflow")
+    db_pool_connections.set(pool.size() + pool._max_overflow, state="max")
+
+
+def report_query_stats(route: str, stats: QueryStats):
+    if stats.budget is not None and stats.statements > stats.budget:
+        logger.warning("%s: %d statements, budget is %d",
+                       route, stats.statements, stats.budget)
+    for shape, count in stats.get_repeated_shapes():
+        logger.warning("%s: statement repeated %d times: %s", route, count, shape)
+
+
+def get_statement_shape(statement: str) -> str:
+    return _whitespace_pattern.sub(" ", _bind_list_pattern.sub("(...)", statement)).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is not None and stats.shapes is not None:
+        _check_statement(stats, statement)
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def _check_statement(stats: QueryStats, statement: str):
+    shape = get_statement_shape(statement)
+    stats.shapes[shape] += 1  # type: ignore
+    if not QUERY_DEBUG_STRICT:
+        return
+    if stats.budget is not None and stats.statements >= stats.budget:
+        raise QueryBudgetExceeded(
+            f"More than {stats.budget} statements in one request: {shape}")
+    if stats.shapes[shape] > QUERY_DEBUG_REPEAT_THRESHOLD:  # type: ignore
+        raise RepeatedQueryDetected(
+            f"Statement repeated {stats.shapes[shape]} times: {shape}")  # type: ignore
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - conn.info["query_start_time"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.duration += duration
+        if stats.crud_durations is not None:
+            stats.crud_durations[_get_crud_function_name()] += duration
+
+    if SLOW_QUERY_THRESHOLD_MS > 0 and duration * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        _log_slow_query(cursor, statement, parameters, executemany, duration, stats)
+
+
+def _log_slow_query(cursor, statement, parameters, executemany, duration, stats):
+    function_name = _get_crud_function_name()
+    db_slow_queries_total.inc(function=function_name)
+    if (random.random() >= SLOW_QUERY_SAMPLE_RATE or
+        not slow_query_rate_limiter.acquire()):
+        return
+
+    plan = None
+    if not executemany and statement.lstrip()[:6].lower().startswith(_explainable_statements):
+        plan = _explain(cursor, statement, parameters)
+    slow_query_logger.warning(
+        "Slow query %.2f ms in %s (route %s)\n%s\nParameters: %.1000r\nPlan:\n%s",
+        duration * 1000,
+        function_name,
+        stats.get_route() if stats else None,
+        statement,
+        _mask_parameters(parameters),
+        plan,
+    )
+
+
+def _mask_parameters(parameters):
+    if not isinstance(parameters, dict):
+        return parameters
+    return {
+        key: "***" if "password" in key.lower() else value
+        for key, value in parameters.items()
+    }
+
+
+def _explain(cursor, statement, parameters) -> str | None:
+    # Отдельный курсор DBAPI в обход SQLAlchemy: события движка не срабатывают
+    # повторно, а точка сохранения не даёт ошибке EXPLAIN прервать транзакцию
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute(f"EXPLAIN (ANALYZE off) {statement}", parameters)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+        except Exception:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None
+        explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception:
+        return None
+    finally:
+        explain_cursor.close()
+
+
+def _get_crud_function_name() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(_crud_filename):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "other"
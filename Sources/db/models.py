@@ -1,6 +1,11 @@
 import pytz
+import logging
 from sqlalchemy import (
+    DDL,
+    text,
+    event,
     Float,
+    Index,
     Column,
     String,
     Double,
@@ -10,11 +15,15 @@ from sqlalchemy import (
     ForeignKey,
 )
 from datetime import datetime
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, deferred
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from db.database import engine
+from db.partitions import create_initial_partitions
 
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 
@@ -27,6 +36,41 @@ class Account(Base):
     email = Column(String, nullable=False, unique=True)
     password = Column(String, nullable=False)
     role = Column(String, default="USER", nullable=False)
+    version = Column(Integer, default=1, nullable=False)
+
+
+# Расширение либо уже установлено, либо его можно установить: pg_trgm
+# доверенное, поэтому хватает права CREATE на базу, иначе нужен суперпользователь
+PG_TRGM_AVAILABLE_QUERY = """
+SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')
+    OR EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')
+        AND (has_database_privilege(current_user, current_database(), 'CREATE')
+             OR (SELECT rolsuper FROM pg_roles WHERE rolname = current_user))
+"""
+
+
+def _is_pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    available = bind.execute(text(PG_TRGM_AVAILABLE_QUERY)).scalar()
+    if not available and ddl.statement.startswith("CREATE EXTENSION"):
+        logger.warning("pg_trgm cannot be installed, account search runs without trigram indexes")
+    return available
+
+
+# Триграммные индексы для поиска аккаунтов по ILIKE '%...%'
+for ddl in (
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    DDL('CREATE INDEX ix_account_firstName_trgm ON account '
+        'USING gin ("firstName" gin_trgm_ops)'),
+    DDL('CREATE INDEX ix_account_lastName_trgm ON account '
+        'USING gin ("lastName" gin_trgm_ops)'),
+    DDL('CREATE INDEX ix_account_email_trgm ON account '
+        'USING gin (email gin_trgm_ops)'),
+):
+    event.listen(
+        Account.__table__,
+        "after_create",
+        ddl.execute_if(callable_=_is_pg_trgm_available)  # type: ignore
+    )
 
 
 class Animal(Base):  
@@ -46,11 +90,35 @@ class Animal(Base):
     chipperId = Column(ForeignKey("account.id"), nullable=False)
     chippingLocationId = Column(ForeignKey("location_point.id"), nullable=False)
     deathDateTime = Column(DateTime(timezone=True))
+    version = Column(Integer, default=1, nullable=False)
 
     animalTypes = relationship("AnimalType", secondary="animalType_animal")
     visitedLocations = relationship(
         "AnimalVisitedLocation",
-        order_by="AnimalVisitedLocation.dateTimeOfVisitLocationPoint"
+        order_by="[AnimalVisitedLocation.dateTimeOfVisitLocationPoint, "
+                 "AnimalVisitedLocation.id]"
+    )
+    visitArchive = relationship("AnimalVisitArchive", uselist=False)
+
+    # Покрывающие индексы для фильтров поиска и подсчёта животных
+    __table_args__ = (
+        Index(
+            "ix_animal_chipper_chipping_datetime",
+            "chipperId",
+            "chippingDateTime",
+            postgresql_include=["chippingLocationId", "lifeStatus", "gender"],
+        ),
+        Index(
+            "ix_animal_chipping_location_chipping_datetime",
+            "chippingLocationId",
+            "chippingDateTime",
+            postgresql_include=["chipperId", "lifeStatus", "gender"],
+        ),
+        Index(
+            "ix_animal_chipping_datetime",
+            "chippingDateTime",
+            postgresql_include=["chipperId", "chippingLocationId", "lifeStatus", "gender"],
+        ),
     )
 
 
@@ -58,7 +126,7 @@ class AnimalType(Base):
     __tablename__ = "animal_type"
     
     id = Column(BigInteger, primary_key=True, index=True)
-    type = Column(String, nullable=False)
+    type = Column(String, nullable=False, unique=True)
 
 
 class AnimalTypeAnimal(Base):
@@ -78,28 +146,78 @@ class LocationPoint(Base):
     id = Column(BigInteger, primary_key=True, index=True)
     latitude = Column(Double, nullable=False)
     longitude = Column(Double, nullable=False)
+    version = Column(Integer, default=1, nullable=False)
 
 
 class AnimalVisitedLocation(Base):
     __tablename__ = "animal_visited_location"
     
-    id = Column(BigInteger, primary_key=True, index=True)
+    # Таблица партиционирована по месяцам, поэтому ключ партиционирования
+    # входит в первичный ключ таблицы; для ORM объект по-прежнему определяет id
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
     id_animal = Column(ForeignKey("animal.id", ondelete="CASCADE"), nullable=False)
     locationPointId = Column(ForeignKey("location_point.id"), nullable=False)
     dateTimeOfVisitLocationPoint = Column(
         DateTime(timezone=True),
         default=datetime.now(tz=pytz.UTC).replace(microsecond=0),
+        primary_key=True,
         nullable=False
         )
 
     location_point = relationship("LocationPoint")
 
+    __mapper_args__ = {"primary_key": [id]}
+
+    __table_args__ = (
+        Index(
+            "ix_animal_visited_location_animal_datetime",
+            "id_animal",
+            "dateTimeOfVisitLocationPoint",
+            "id",
+        ),
+        {"postgresql_partition_by": 'RANGE ("dateTimeOfVisitLocationPoint")'},
+    )
+
+
+event.listen(
+    AnimalVisitedLocation.__table__,
+    "after_create",
+    create_initial_partitions
+)
+
+
+# Архив старых посещений: одна строка на животное, посещения хранятся
+# массивами в порядке (dateTimeOfVisitLocationPoint, id) и всегда старше
+# оставшихся в animal_visited_location
+class AnimalVisitArchive(Base):
+    __tablename__ = "animal_visit_archive"
+
+    id_animal = Column(ForeignKey("animal.id", ondelete="CASCADE"), primary_key=True)
+    visitCount = Column(Integer, nullable=False)
+    firstDateTime = Column(DateTime(timezone=True), nullable=False)
+    lastDateTime = Column(DateTime(timezone=True), nullable=False, index=True)
+    ids = Column(ARRAY(BigInteger), nullable=False)
+    # Точки и время нужны только при чтении самих архивных посещений
+    locationPointIds = deferred(
+        Column(ARRAY(BigInteger), nullable=False), group="visits")
+    dateTimes = deferred(
+        Column(ARRAY(DateTime(timezone=True)), nullable=False), group="visits")
+
+    __table_args__ = (
+        Index(
+            "ix_animal_visit_archive_location_point_ids",
+            "locationPointIds",
+            postgresql_using="gin",
+        ),
+    )
+
 
 class Area(Base):
     __tablename__ = "area"
 
     id = Column(BigInteger, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
+    version = Column(Integer, default=1, nullable=False)
 
     areaPoints = relationship("AreaPoints", order_by="AreaPoints.id")
 
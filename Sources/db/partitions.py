@@ -0,0 +1,194 @@
+import re
+import pytz
+import argparse
+from datetime import datetime, date
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection
+
+from db.database import engine
+from config.config import VISITED_LOCATIONS_PARTITIONS_AHEAD
+
+
+PARENT_TABLE = "animal_visited_location"
+PARTITION_KEY = '"dateTimeOfVisitLocationPoint"'
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+_partition_name_pattern = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def get_month_start(value: date) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=pytz.UTC)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=pytz.UTC)
+
+
+def get_partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month:%Y}m{month:%m}"
+
+
+def get_partitions(connection: Connection) -> dict[datetime, str]:
+    rows = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE}).scalars()
+    partitions = {}
+    for name in rows:
+        match = _partition_name_pattern.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions[datetime(year, month, 1, tzinfo=pytz.UTC)] = name
+    return partitions
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.execute(text(
+        "SELECT relkind = 'p' FROM pg_class "
+        "WHERE relname = :parent AND relnamespace = current_schema()::regnamespace"
+    ), {"parent": PARENT_TABLE}).scalar() or False
+
+
+def create_default_partition(connection: Connection):
+    connection.exec_driver_sql(
+        f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" '
+        f'PARTITION OF "{PARENT_TABLE}" DEFAULT'
+    )
+
+
+def create_partition(connection: Connection, month: datetime) -> bool:
+    if month in get_partitions(connection):
+        return False
+    name = get_partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+
+    # Строки этого месяца, попавшие в партицию по умолчанию, переносятся
+    # в новую партицию до её подключения, иначе ATTACH завершится ошибкой
+    connection.exec_driver_sql(
+        f'CREATE TABLE "{name}" (LIKE "{PARENT_TABLE}" '
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    connection.execute(text(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+        f"WHERE {PARTITION_KEY} >= :start AND {PARTITION_KEY} < :end RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ), bounds)
+    connection.exec_driver_sql(
+        f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" FOR VALUES '
+        f"FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    )
+    return True
+
+
+def create_partitions(connection: Connection, start: date, end: date) -> list[str]:
+    created = []
+    month = get_month_start(start)
+    while month <= get_month_start(end):
+        if create_partition(connection, month):
+            created.append(get_partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def create_partitions_ahead(connection: Connection, months: int) -> list[str]:
+    today = datetime.now(tz=pytz.UTC)
+    return create_partitions(connection, today, add_months(get_month_start(today), months))
+
+
+def detach_partitions(connection: Connection, before: date, drop: bool = False) -> list[str]:
+    detached = []
+    for month, name in sorted(get_partitions(connection).items()):
+        if add_months(month, 1) > get_month_start(before):
+            continue
+        connection.exec_driver_sql(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+        if drop:
+            connection.exec_driver_sql(f'DROP TABLE "{name}"')
+        detached.append(name)
+    return detached
+
+
+def migrate_table(connection: Connection, table: Table) -> bool:
+    if is_partitioned(connection):
+        return False
+    old_table = f"{PARENT_TABLE}_unpartitioned"
+
+    # Индексы и последовательность старой таблицы переименовываются,
+    # чтобы новая таблица создалась с прежними именами
+    connection.exec_driver_sql(f'ALTER TABLE "{PARENT_TABLE}" RENAME TO "{old_table}"')
+    indexes = connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table"
+    ), {"table": old_table}).scalars().all()
+    for index in indexes:
+        connection.exec_driver_sql(f'ALTER INDEX "{index}" RENAME TO "{index}_unpartitioned"')
+    connection.exec_driver_sql(
+        f'ALTER SEQUENCE "{PARENT_TABLE}_id_seq" RENAME TO "{old_table}_id_seq"')
+
+    table.create(connection)
+    first, last = connection.exec_driver_sql(
+        f'SELECT min({PARTITION_KEY}), max({PARTITION_KEY}) FROM "{old_table}"'
+    ).one()
+    if first is not None:
+        create_partitions(connection, first, last)
+
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    connection.exec_driver_sql(
+        f'INSERT INTO "{PARENT_TABLE}" ({columns}) SELECT {columns} FROM "{old_table}"')
+    connection.exec_driver_sql(
+        f"SELECT setval(pg_get_serial_sequence('{PARENT_TABLE}', 'id'), "
+        f'(SELECT COALESCE(max(id), 1) FROM "{PARENT_TABLE}"))'
+    )
+    connection.exec_driver_sql(f'DROP TABLE "{old_table}"')
+    return True
+
+
+def create_initial_partitions(target, connection: Connection, **kw):
+    create_default_partition(connection)
+    create_partitions_ahead(connection, VISITED_LOCATIONS_PARTITIONS_AHEAD)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Обслуживание помесячных партиций animal_visited_location "
+                    "(create запускается по расписанию, например раз в месяц)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="Создать партиции наперёд")
+    create_parser.add_argument("--months", type=int, default=VISITED_LOCATIONS_PARTITIONS_AHEAD)
+    create_parser.add_argument("--start", type=date.fromisoformat,
+                               help="Создать партиции и для прошлых месяцев с этой даты")
+
+    detach_parser = subparsers.add_parser(
+        "detach", help="Отключить партиции, целиком лежащие раньше даты")
+    detach_parser.add_argument("--before", type=date.fromisoformat, required=True)
+    detach_parser.add_argument("--drop", action="store_true",
+                               help="Удалить отключённые партиции")
+
+    subparsers.add_parser("migrate", help="Перевести существующую таблицу на партиции")
+    subparsers.add_parser("list", help="Показать партиции")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        match args.command:
+            case "create":
+                created = create_partitions_ahead(connection, args.months)
+                if args.start:
+                    created += create_partitions(connection, args.start, datetime.now(tz=pytz.UTC))
+                print("\n".join(created) or "Nothing to create")
+            case "detach":
+                detached = detach_partitions(connection, args.before, args.drop)
+                print("\n".join(detached) or "Nothing to detach")
+            case "migrate":
+                from db.models import AnimalVisitedLocation
+                migrated = migrate_table(connection, AnimalVisitedLocation.__table__)  # type: ignore
+                print("Migrated" if migrated else "Already partitioned")
+            case "list":
+                for month, name in sorted(get_partitions(connection).items()):
+                    print(f"{month:%Y-%m} {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import logging
+from itertools import count
+from threading import Event, Thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from controllers.metrics import db_replica_healthy
+
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах; 0, если все полученные WAL уже применены
+REPLICATION_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        # До первой проверки реплика не используется
+        self.healthy = False
+
+
+class ReplicaRouter:
+    def __init__(self, engines: list[Engine], check_interval: float, max_lag: float):
+        self._replicas = [
+            Replica(str(number), engine) for number, engine in enumerate(engines)
+        ]
+        self._check_interval = check_interval
+        self._max_lag = max_lag
+        self._counter = count()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+        for replica in self._replicas:
+            event.listen(replica.engine, "handle_error", self._make_error_listener(replica))
+
+    def start(self):
+        # Проверки идут в фоновом потоке, а не в запросе; поток мастера gunicorn
+        # не переживает fork, поэтому каждый воркер запускает свой при старте
+        if not self._replicas or self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name="replica-health-check", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def get_engine(self) -> Engine | None:
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[next(self._counter) % len(self._replicas)]
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    def _run(self):
+        while True:
+            for replica in self._replicas:
+                self._set_health(replica, self._probe(replica))
+            if self._stopped.wait(self._check_interval):
+                return
+
+    def _probe(self, replica: Replica) -> bool:
+        try:
+            with replica.engine.connect() as connection:
+                lag = connection.exec_driver_sql(REPLICATION_LAG_QUERY).scalar()
+        except Exception:
+            logger.warning("Replica %s health check failed", replica.name, exc_info=True)
+            return False
+        if self._max_lag > 0 and lag is not None and lag > self._max_lag:
+            logger.warning("Replica %s lags by %.1f s", replica.name, lag)
+            return False
+        return True
+
+    def _set_health(self, replica: Replica, healthy: bool):
+        replica.healthy = healthy
+        db_replica_healthy.set(int(healthy), replica=replica.name)
+
+    def _make_error_listener(self, replica: Replica):
+        def listener(context):
+            if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception, OperationalError
+            ):
+                self._set_health(replica, False)
+        return listener
@@ -1,32 +1,69 @@
 from fastapi import FastAPI, status
 from fastapi.encoders import jsonable_encoder
-from  fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from routers import registration
+from routers import login
 from routers import accounts
 from routers import locations
 from routers import animal_types
+from routers import telemetry
 from routers import animals
 from routers import visited_locations
 from routers import areas
+from routers import metrics
+from db.cache import animal_type_cache
+from db.database import SessionLocal, engine, replica_engines, replica_router
+from controllers.middleware import MetricsMiddleware, PrimaryStickinessMiddleware
+from controllers.profiling import ProfilingMiddleware
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if replica_engines:
+    app.add_middleware(PrimaryStickinessMiddleware)
+
+
+@app.on_event("startup")
+def warm_caches():
+    with SessionLocal() as db:
+        animal_type_cache.warm(db)
+    animal_type_cache.start_listening(engine)
+
+
+@app.on_event("shutdown")
+def stop_cache_invalidation():
+    animal_type_cache.stop_listening()
+
+
+@app.on_event("startup")
+def start_replica_checks():
+    replica_router.start()
+
+
+@app.on_event("shutdown")
+def stop_replica_checks():
+    replica_router.stop()
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc: RequestValidationError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content=jsonable_encoder({"detail": exc.errors()})
     )
 
 
 app.include_router(registration.router)
+app.include_router(login.router)
 app.include_router(accounts.router)
 app.include_router(locations.router)
 app.include_router(animal_types.router)
+app.include_router(telemetry.router)
 app.include_router(animals.router)
 app.include_router(visited_locations.router)
 app.include_router(areas.router)
+app.include_router(metrics.router)
@@ -63,6 +63,13 @@ class Account(AccountRegistration, AccountOut):
     pass
 
 
+#Token ------------------------------------------------------------------------
+class AccessToken(BaseModel):
+    accessToken: str
+    tokenType: str = "bearer"
+    expiresIn: int
+
+
 #LocationPoint ----------------------------------------------------------------
 class LocationPointBase(BaseModel):
     latitude: float
@@ -172,6 +179,20 @@ class Animal(AnimalBase, AnimalTypes):
     deathDateTime: datetime | None
 
 
+class VisitedLocationsSlice(BaseModel):
+    items: list[int]
+    count: int
+    nextCursor: int | None
+
+
+class AnimalWithVisitedLocationsSlice(AnimalBase, AnimalTypes):
+    id: int
+    lifeStatus: LifeStatus
+    chippingDateTime: datetime
+    visitedLocations: VisitedLocationsSlice
+    deathDateTime: datetime | None
+
+
 # AnimalVisitedLocation -------------------------------------------------------
 class AnimalVisitedLocationSearch(BaseModel):
     startDateTime: datetime | None
@@ -189,6 +210,27 @@ class AnimalVisitedLocationChange(BaseModel):
     locationPointId: int = Field(gt=0)
 
 
+class AnimalVisitedLocationFix(BaseModel):
+    animalId: int = Field(gt=0)
+    pointId: int = Field(gt=0)
+    dateTimeOfVisitLocationPoint: datetime | None
+
+
+class AnimalVisitedLocationFixResult(BaseModel):
+    animalId: int
+    pointId: int
+    status: int
+    id: int | None
+    dateTimeOfVisitLocationPoint: datetime | None
+
+
+class AnimalVisitedLocationFixAck(BaseModel):
+    seq: int | None
+    status: int
+    id: int | None
+    dateTimeOfVisitLocationPoint: datetime | None
+
+
 # Area ------------------------------------------------------------------------
 class Point(BaseModel):
     latitude: float = Field(ge=-90, le=90)
@@ -265,6 +307,11 @@ class AreaAnalytics(BaseModel):
         orm_mode = True
 
 
+class CountMode(str, Enum):
+    EXACT = "EXACT"
+    ESTIMATE = "ESTIMATE"
+
+
 class AnalyticsGroup(str, Enum):
     QUANTITY = "QUANTITY"
     ARRIVED = "ARRIVED"
@@ -1,43 +1,36 @@
+from sqlalchemy.orm import Session
+
 from models.schemas import AccountAdding, Role
 from controllers.password import get_password_hash
 from db.database import SessionLocal
 from db.crud import exists_account_with_email, create_account_with_role
 
 
-if __name__=="__main__":
-    with SessionLocal() as db:
-        admin_account = exists_account_with_email(db, "admin@simbirsoft.com")
-        chipper_account = exists_account_with_email(db, "chipper@simbirsoft.com")
-        user_account = exists_account_with_email(db, "user@simbirsoft.com")
+DEFAULT_ACCOUNTS = (
+    ("admin", Role.ADMIN),
+    ("chipper", Role.CHIPPER),
+    ("user", Role.USER),
+)
+
 
+def create_default_accounts(db: Session):
     password = get_password_hash("qwerty123")
 
-    if not admin_account:
-        admin_account_data = AccountAdding(
-            firstName = "adminFirstName",
-            lastName = "adminLastName",
-            email = "admin@simbirsoft.com",
-            password = password,
-            role = Role.ADMIN
-        )
-        create_account_with_role(db, admin_account_data)
-    
-    if not chipper_account:
-        chipper_account_data = AccountAdding(
-            firstName = "chipperFirstName",
-            lastName = "chipperLastName",
-            email = "chipper@simbirsoft.com",
-            password = password,
-            role = Role.CHIPPER
-        )
-        create_account_with_role(db, chipper_account_data)
-    
-    if not user_account:
-        user_account_data = AccountAdding(
-            firstName = "userFirstName",
-            lastName = "userLastName",
-            email = "user@simbirsoft.com",
+    for name, role in DEFAULT_ACCOUNTS:
+        email = f"{name}@simbirsoft.com"
+        if exists_account_with_email(db, email):
+            continue
+
+        account_data = AccountAdding(
+            firstName = f"{name}FirstName",
+            lastName = f"{name}LastName",
+            email = email,
             password = password,
-            role = Role.USER
+            role = role
         )
-        create_account_with_role(db, user_account_data)
+        create_account_with_role(db, account_data)
+
+
+if __name__=="__main__":
+    with SessionLocal() as db:
+        create_default_accounts(db)
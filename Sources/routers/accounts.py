@@ -1,10 +1,12 @@
 from typing import Annotated
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, status, HTTPException, Depends, Query, Path
+from fastapi.responses import ORJSONResponse
 
 from models import schemas
 from db.crud import (
     get_accounts, 
+    count_accounts,
     get_user_by_id, 
     update_account,
     delete_account,
@@ -16,7 +18,9 @@ from db.crud import (
 from controllers.db import get_db
 from controllers.password import get_password_hash
 from controllers.validation import validate_account
+from controllers.serialization import serialize_account
 from controllers.user import get_current_account, check_role
+from controllers.query_budget import query_budget
 
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
@@ -24,6 +28,7 @@ router = APIRouter(prefix="/accounts", tags=["accounts"])
 
 @router.get(
     path="/search",
+    dependencies=[Depends(query_budget(4))],
     response_model=list[schemas.AccountOut],
     status_code=status.HTTP_200_OK,
     summary="Поиск аккаунтов пользователей по параметрам"
@@ -32,14 +37,19 @@ async def search_accounts(
     search_data: schemas.AccountSearch = Depends(),
     skip: int = Query(default=0, alias="from", ge=0),
     size: int = Query(default=10, gt=0),
+    count: schemas.CountMode | None = Query(default=None),
     db: Session = Depends(get_db),
     auth_user: schemas.Account = Depends(get_current_account)
 ): 
     check_role(auth_user.role, [schemas.Role.ADMIN])
 
     accounts = get_accounts(db, search_data, skip, size)
-    valid_accounts = [validate_account(account) for account in accounts]
-    return valid_accounts
+    response = ORJSONResponse(
+        content=[serialize_account(account) for account in accounts])
+    if count:
+        response.headers["X-Total-Count"] = str(
+            count_accounts(db, search_data, count))
+    return response
 
 
 @router.get(
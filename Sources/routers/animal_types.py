@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, status, Depends, Path
 from models import schemas
 from db.crud import (
     get_animal_type,
+    get_animal_types_by_ids,
     create_animal_type,
     update_animal_type,
     delete_animal_type,
@@ -12,6 +13,7 @@ from db.crud import (
     is_animal_type_linked_with_animals,
 )
 from controllers.db import get_db
+from controllers.batch import get_batch_ids
 from controllers.validation import validate_animal_type
 from controllers.user import get_current_account, check_role
 
@@ -39,6 +41,21 @@ async def add_animal_type(
     return validate_animal_type(db_animal_type)
 
 
+@router.get(
+    path="/batch",
+    response_model=list[schemas.AnimalType],
+    status_code=status.HTTP_200_OK,
+    summary="Получение информации о нескольких типах животных"
+)
+async def get_types(
+    ids: list[int] = Depends(get_batch_ids),
+    db: Session = Depends(get_db),
+    _: schemas.Account = Depends(get_current_account)
+):
+    animal_types = get_animal_types_by_ids(db, ids)
+    return [validate_animal_type(animal_type) for animal_type in animal_types]
+
+
 @router.get(
     path="/{typeId}",
     response_model=schemas.AnimalType,
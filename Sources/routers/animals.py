@@ -1,26 +1,54 @@
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Path
+from fastapi import (
+    APIRouter, HTTPException, status, Depends, Query, Path, Header, Response
+)
+from fastapi.responses import ORJSONResponse
 
 from models import schemas
 from db.crud import (
     get_animal,
     get_animals,
+    count_animals,
+    get_animals_by_ids,
+    get_animal_version,
     create_animal,
+    create_animals,
     update_animal,
     delete_animal,
     has_animal_type,
+    get_visited_location,
+    get_archived_visited_location,
     exists_animal_with_id,
+    count_visited_locations,
+    get_visited_location_ids,
+    get_last_visited_location,
+    get_first_visited_location,
     exists_account_with_id,
     exists_animal_type_with_id,
     update_animal_type_of_animal,
     delete_animal_type_of_animal,
     get_animal_type_of_animal_len,
     exists_location_point_with_id,
+    get_existing_account_ids,
+    get_existing_animal_type_ids,
+    get_existing_location_point_ids,
+    count_visited_locations_of_animals,
+    get_visited_location_ids_of_animals,
     create_animalType_animal_connection,
 )
+from config.config import ANIMALS_BATCH_MAX_SIZE
 from controllers.db import get_db
-from controllers.validation import validate_animal
+from controllers.batch import get_batch_ids
+from controllers.fields import ANIMAL_FIELDS, get_animal_fields
+from controllers.etag import make_etag, is_etag_matched
+from controllers.serialization import serialize_animal
+from controllers.validation import (
+    validate_animal,
+    validate_visited_locations_slice,
+    validate_animal_with_visited_locations_slice,
+)
 from controllers.user import get_current_account, check_role
+from controllers.query_budget import query_budget
 
 
 router = APIRouter(prefix="/animals", tags=["animal"])
@@ -52,38 +80,157 @@ async def add_animal(
     return validate_animal(create_animal(db, animal))
 
 
+@router.post(
+    path="/batch",
+    response_model=list[schemas.Animal],
+    status_code=status.HTTP_201_CREATED,
+    summary="Пакетное добавление новых животных"
+)
+async def add_animals(
+    animals: list[schemas.AnimalCreation],
+    db: Session = Depends(get_db),
+    auth_user: schemas.Account = Depends(get_current_account)
+):
+    check_role(auth_user.role, [schemas.Role.ADMIN, schemas.Role.CHIPPER])
+
+    if not animals or len(animals) > ANIMALS_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    type_ids = {type_id for animal in animals for type_id in animal.animalTypes}
+    chipper_ids = {animal.chipperId for animal in animals}
+    point_ids = {animal.chippingLocationId for animal in animals}
+
+    if (get_existing_animal_type_ids(db, list(type_ids)) != type_ids or
+        get_existing_account_ids(db, list(chipper_ids)) != chipper_ids or
+        get_existing_location_point_ids(db, list(point_ids)) != point_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return ORJSONResponse(
+        content=[serialize_animal(animal) for animal in create_animals(db, animals)],
+        status_code=status.HTTP_201_CREATED
+    )
+
+
 @router.get(
-    path="/search",
+    path="/batch",
+    dependencies=[Depends(query_budget(4))],
     response_model=list[schemas.Animal],
     status_code=status.HTTP_200_OK,
+    summary="Получение информации о нескольких животных"
+)
+async def get_animals_information(
+    ids: list[int] = Depends(get_batch_ids),
+    fields: list[str] | None = Depends(get_animal_fields),
+    db: Session = Depends(get_db),
+    _: schemas.Account = Depends(get_current_account)
+):
+    animals = get_animals_by_ids(db, ids, fields)
+    return ORJSONResponse(
+        content=[serialize_animal(animal, fields=fields) for animal in animals])
+
+
+@router.get(
+    path="/search",
+    dependencies=[Depends(query_budget(8))],
+    response_model=list[schemas.Animal | schemas.AnimalWithVisitedLocationsSlice],
+    status_code=status.HTTP_200_OK,
     summary="Поиск животных по параметрам"
 )
 async def search_animals(
     search_data: schemas.AnimalSearch = Depends(),
     skip: int = Query(default=0, alias="from", ge=0),
     size: int = Query(default=10, gt=0),
+    visitedLocationsLimit: int | None = Query(default=None, gt=0),
+    fields: list[str] | None = Depends(get_animal_fields),
+    count: schemas.CountMode | None = Query(default=None),
     db: Session = Depends(get_db),
     _: schemas.Account = Depends(get_current_account)
 ):
-    animals = get_animals(db, search_data, skip, size)
-    return [validate_animal(animal) for animal in animals]
+    headers = None
+    if count:
+        headers = {"X-Total-Count": str(count_animals(db, search_data, count))}
+
+    if not visitedLocationsLimit or fields and "visitedLocations" not in fields:
+        animals = get_animals(db, search_data, skip, size, fields)
+        return ORJSONResponse(
+            content=[serialize_animal(animal, fields=fields) for animal in animals],
+            headers=headers
+        )
+
+    fields = fields or ANIMAL_FIELDS
+    animals = get_animals(db, search_data, skip, size,
+                          [field for field in fields if field != "visitedLocations"])
+    animal_ids = [animal.id for animal in animals]
+    visited_location_ids = get_visited_location_ids_of_animals(
+        db, animal_ids, visitedLocationsLimit + 1)  # type: ignore
+    visited_locations_counts = count_visited_locations_of_animals(db, animal_ids)  # type: ignore
+    return ORJSONResponse(content=[
+        serialize_animal(
+            animal,
+            validate_visited_locations_slice(
+                visited_location_ids[animal.id],  # type: ignore
+                visited_locations_counts[animal.id],  # type: ignore
+                visitedLocationsLimit
+            ).dict(),
+            fields
+        )
+        for animal in animals
+    ], headers=headers)
 
 
 @router.get(
     path="/{animalId}",
-    response_model=schemas.Animal,
+    dependencies=[Depends(query_budget(8))],
+    response_model=schemas.Animal | schemas.AnimalWithVisitedLocationsSlice,
     status_code=status.HTTP_200_OK,
     summary="Получение информации о животном"
 )
 async def get_animal_information(
+    response: Response,
     animalId: int = Path(gt=0),
+    visitedLocationsLimit: int | None = Query(default=None, gt=0),
+    visitedLocationsCursor: int | None = Query(default=None, gt=0),
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     _: schemas.Account = Depends(get_current_account)
 ): 
+    version = get_animal_version(db, animalId)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    if not visitedLocationsLimit and visitedLocationsCursor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    etag = make_etag(
+        version, limit=visitedLocationsLimit, cursor=visitedLocationsCursor)
+    if is_etag_matched(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     animal = get_animal(db, animalId)
     if not animal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    return validate_animal(animal)
+
+    if not visitedLocationsLimit:
+        return validate_animal(animal)
+
+    cursor = None
+    if visitedLocationsCursor:
+        cursor = (get_visited_location(db, visitedLocationsCursor)
+                  or get_archived_visited_location(db, animalId, visitedLocationsCursor))
+        if not cursor or cursor.id_animal != animalId:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    visited_location_ids = get_visited_location_ids(
+        db, animalId, cursor, visitedLocationsLimit + 1)
+    return validate_animal_with_visited_locations_slice(
+        animal,
+        validate_visited_locations_slice(
+            visited_location_ids,
+            count_visited_locations(db, animalId),
+            visitedLocationsLimit
+        )
+    )
 
 
 @router.put(
@@ -108,8 +255,9 @@ async def update_animal_information(
         animal.lifeStatus == schemas.LifeStatus.DEAD):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
     
-    if (animal.visitedLocations and 
-        update_data.chippingLocationId == animal.visitedLocations[0].locationPointId):
+    first_visited_location = get_first_visited_location(db, animalId)
+    if (first_visited_location and 
+        update_data.chippingLocationId == first_visited_location.locationPointId):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
     if not exists_account_with_id(db, update_data.chipperId):
@@ -138,8 +286,9 @@ async def delete_animal_information(
     if not animal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     
-    if (animal.visitedLocations and
-        animal.chippingLocationId != animal.visitedLocations[-1].locationPointId):
+    last_visited_location = get_last_visited_location(db, animalId)
+    if (last_visited_location and
+        animal.chippingLocationId != last_visited_location.locationPointId):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
     delete_animal(db, animalId)
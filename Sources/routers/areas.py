@@ -1,10 +1,15 @@
 from shapely import Polygon, Point
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Header, Response
+from fastapi.responses import ORJSONResponse
 
 from models import schemas
 from controllers.db import get_db
-from controllers.area import get_polygon
+from controllers.batch import get_batch_ids
+from controllers.fields import get_area_fields
+from controllers.serialization import serialize_area
+from controllers.area import get_polygon, check_new_area_overlap
+from controllers.etag import make_etag, is_etag_matched
 from controllers.analytics import (
     create_types_analytics,
     save_animals_with_vis_loc_in_area,
@@ -19,6 +24,8 @@ from db.crud import (
     update_area,
     delete_area,
     get_all_areas,
+    get_area_version,
+    get_areas_by_ids,
     get_area_by_name,
     exists_area_with_id,
     exists_area_with_name,
@@ -28,26 +35,61 @@ from db.crud import (
     get_animals_without_vis_locs_and_with_chip_loc_before_date
 )
 from controllers.check import check_border_intersect_in_polygon
+from controllers.query_budget import query_budget
 
 
 router = APIRouter(prefix="/areas", tags=["areas"])
 
 
+@router.get(
+    path="/batch",
+    dependencies=[Depends(query_budget(4))],
+    response_model=list[schemas.AreaOut],
+    status_code=status.HTTP_200_OK,
+    summary="Получение информации о нескольких зонах"
+)
+async def get_areas(
+    ids: list[int] = Depends(get_batch_ids),
+    fields: list[str] | None = Depends(get_area_fields),
+    db: Session = Depends(get_db),
+    _: schemas.Account = Depends(get_current_account)
+):
+    areas = get_areas_by_ids(db, ids, fields)
+    if fields is not None:
+        return ORJSONResponse(content=[serialize_area(area, fields) for area in areas])
+    return [validate_area_out(area) for area in areas]
+
+
 @router.get(
     path="/{areaId}",
+    dependencies=[Depends(query_budget(5))],
     response_model=schemas.AreaOut,
     status_code=status.HTTP_200_OK,
     summary="Получение информации о зоне",
 )
 async def get_current_area(
+    response: Response,
     areaId: int = Path(gt=0),
+    if_none_match: str | None = Header(default=None),
+    fields: list[str] | None = Depends(get_area_fields),
     db: Session = Depends(get_db),
     _: schemas.Account = Depends(get_current_account),
 ):
-    area = get_area(db, areaId)
+    version = get_area_version(db, areaId)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    etag = make_etag(version, fields="+".join(sorted(fields)) if fields else None)
+    if is_etag_matched(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    area = get_area(db, areaId, fields)
     if not area:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
+    if fields is not None:
+        return ORJSONResponse(content=serialize_area(area, fields), headers={"ETag": etag})
     return validate_area_out(area)
 
 
@@ -74,21 +116,7 @@ async def add_area(
 
     check_border_intersect_in_polygon(new_polygon)
 
-    areas = get_all_areas(db)
-    for area in areas:  # type: ignore
-        area_polygon = Polygon(
-            [(point.latitude, point.longitude) for point in area.areaPoints]
-        )
-
-        if new_polygon.equals(area_polygon):
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT)
-        if (
-            not new_polygon.touches(area_polygon)
-            and new_polygon.intersects(area_polygon)
-            or new_polygon.contains(area_polygon)
-            or area_polygon.contains(new_polygon)
-        ):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+    check_new_area_overlap(new_polygon, get_all_areas(db))  # type: ignore
 
     db_area = create_area(db, new_area)
     return validate_area_out(db_area)
@@ -162,6 +190,7 @@ async def delete_current_area(
 
 @router.get(
     path="/{areaId}/analytics",
+    dependencies=[Depends(query_budget(15))],
     tags=["analytics"],
     response_model=schemas.AreaAnalytics,
     status_code=status.HTTP_200_OK,
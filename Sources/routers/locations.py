@@ -1,12 +1,14 @@
 import base64
 import pygeohash as pgh
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Header, Response
 from fastapi.responses import PlainTextResponse
 
 from models import schemas
 from db.crud import (
     get_location_point,
+    get_location_point_version,
+    get_location_points_by_ids,
     create_location_point,
     update_location_point,
     delete_location_point,
@@ -18,6 +20,8 @@ from db.crud import (
     exists_location_point_with_latitude_and_longitude,
 )
 from controllers.db import get_db
+from controllers.batch import get_batch_ids
+from controllers.etag import make_etag, is_etag_matched
 from controllers.validation import validate_location_point
 from controllers.user import get_current_account, check_role
 
@@ -106,6 +110,21 @@ async def get_location_hash_v3(
     return pgh.encode(coords.latitude, coords.longitude)
 
 
+@router.get(
+    path="/batch",
+    response_model=list[schemas.LocationPoint],
+    status_code=status.HTTP_200_OK,
+    summary="Получение информации о нескольких точках локации животных"
+)
+async def get_locations(
+    ids: list[int] = Depends(get_batch_ids),
+    db: Session = Depends(get_db),
+    _: schemas.Account = Depends(get_current_account)
+):
+    location_points = get_location_points_by_ids(db, ids)
+    return [validate_location_point(point) for point in location_points]
+
+
 @router.get(
     path="/{pointId}",
     response_model=schemas.LocationPoint,
@@ -113,10 +132,21 @@ async def get_location_hash_v3(
     summary="Получение информации о точке локации животных"
 )
 async def get_location(
+    response: Response,
     pointId: int = Path(gt=0),
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     _: schemas.Account = Depends(get_current_account)
 ):
+    version = get_location_point_version(db, pointId)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    etag = make_etag(version)
+    if is_etag_matched(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     location_point = get_location_point(db, pointId)
     if not location_point:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+from fastapi.security import HTTPBasicCredentials
+from fastapi import APIRouter, status, HTTPException, Depends
+
+from models import schemas
+from controllers.db import get_db
+from controllers.auth import security, create_access_token
+from controllers.user import authenticate_account
+from config.config import ACCESS_TOKEN_TTL
+
+
+router = APIRouter()
+
+
+@router.post(
+    path="/login",
+    tags=["login"],
+    response_model=schemas.AccessToken,
+    status_code=status.HTTP_200_OK,
+    summary="Получение токена доступа",
+)
+async def login(
+    db: Session = Depends(get_db),
+    credentials: HTTPBasicCredentials = Depends(security),
+):
+    account = authenticate_account(db, credentials.username, credentials.password)
+    if not account:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    return schemas.AccessToken(
+        accessToken=create_access_token(account),
+        expiresIn=ACCESS_TOKEN_TTL
+    )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from db.database import engine
+from db.instrumentation import update_pool_metrics
+from controllers.metrics import registry
+
+
+router = APIRouter()
+
+
+@router.get(path="/metrics", include_in_schema=False)
+async def get_metrics():
+    update_pool_metrics(engine)
+    return PlainTextResponse(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
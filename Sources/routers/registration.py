@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from fastapi.security import HTTPBasicCredentials
+from fastapi.security import HTTPBasicCredentials, HTTPAuthorizationCredentials
 from fastapi import APIRouter, status, HTTPException, Depends
 
 from models import schemas
@@ -7,7 +7,7 @@ from db.crud import create_account, exists_account_with_email
 from controllers.db import get_db
 from controllers.password import get_password_hash
 from controllers.validation import validate_account
-from controllers.auth import security_without_auto_error
+from controllers.auth import security_without_auto_error, bearer_security
 
 
 router = APIRouter()
@@ -24,8 +24,9 @@ async def process_registration(
     account: schemas.AccountRegistration,
     db: Session = Depends(get_db),
     credentials: HTTPBasicCredentials | None = Depends(security_without_auto_error),
+    bearer: HTTPAuthorizationCredentials | None = Depends(bearer_security),
 ):
-    if credentials:
+    if credentials or bearer:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
     
     if exists_account_with_email(db, account.email):  # type: ignore
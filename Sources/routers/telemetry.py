@@ -0,0 +1,52 @@
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, WebSocket, status, Depends
+
+from models import schemas
+from controllers.db import get_db
+from controllers.ingestion import ingest_visited_locations, receive_visited_locations
+from controllers.user import get_current_account, check_role, authenticate_authorization
+from config.config import VISITED_LOCATIONS_BATCH_MAX_SIZE
+
+
+router = APIRouter(prefix="/animals/locations", tags=["chip telemetry"])
+
+
+@router.post(
+    path="/batch",
+    response_model=list[schemas.AnimalVisitedLocationFixResult],
+    status_code=status.HTTP_200_OK,
+    summary="Пакетное добавление точек локации, посещённых животными"
+)
+async def add_visited_locations_batch(
+    fixes: list[schemas.AnimalVisitedLocationFix],
+    db: Session = Depends(get_db),
+    auth_user: schemas.Account = Depends(get_current_account)
+):
+    check_role(auth_user.role, [schemas.Role.ADMIN, schemas.Role.CHIPPER])
+
+    if len(fixes) > VISITED_LOCATIONS_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+    return ingest_visited_locations(db, fixes)
+
+
+# Каждый фикс подтверждается ack с его seq после коммита пачки. При разрыве
+# соединения несохранённая пачка отбрасывается, но ack может потеряться и после
+# коммита, поэтому фиксы без ack считаются "возможно сохранёнными": клиент
+# отправляет их повторно с dateTimeOfVisitLocationPoint, и повтор уже
+# сохранённого фикса получает 400
+@router.websocket(path="/stream")
+async def stream_visited_locations(
+    websocket: WebSocket,
+    db: Session = Depends(get_db)
+):
+    account = authenticate_authorization(db, websocket.headers.get("authorization"))
+    if (not account or
+        account.role not in (schemas.Role.ADMIN, schemas.Role.CHIPPER)):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    # Транзакция проверки не должна висеть "idle in transaction" до первой пачки
+    db.rollback()
+
+    await websocket.accept()
+    await receive_visited_locations(websocket, db)
@@ -1,12 +1,17 @@
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, HTTPException, status, Depends, Query, Path
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from models import schemas
 from db.crud import (
     get_animal,
     get_visited_location,
     exists_animal_with_id,
+    get_next_visited_location,
+    get_last_visited_location,
+    get_previous_visited_location,
     get_visited_locastions,
+    iter_visited_location_ids,
     update_visited_location,
     delete_visited_location,
     exists_location_point_with_id,
@@ -14,8 +19,11 @@ from db.crud import (
 )
 from controllers.db import get_db
 from controllers.check import is_point_as_prev_or_next
+from controllers.streaming import iter_json_array
+from controllers.serialization import serialize_visited_location
 from controllers.user import get_current_account, check_role
 from controllers.validation import validate_visited_location
+from controllers.query_budget import query_budget
 
 
 router = APIRouter(
@@ -26,6 +34,7 @@ router = APIRouter(
 
 @router.get(
     path="",
+    dependencies=[Depends(query_budget(4))],
     response_model=list[schemas.AnimalVisitedLocationOut],
     status_code=status.HTTP_200_OK,
     summary="Просмотр точек локации, посещенных животным"
@@ -42,7 +51,28 @@ async def search_visited_locations(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     
     visited_locations = get_visited_locastions(db, animalId, search_data, skip, size)
-    return [validate_visited_location(loc) for loc in visited_locations]
+    return ORJSONResponse(
+        content=[serialize_visited_location(loc) for loc in visited_locations])
+
+
+@router.get(
+    path="/ids",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Потоковая выгрузка идентификаторов посещенных животным точек"
+)
+async def stream_visited_location_ids(
+    animalId: int = Path(gt=0),
+    db: Session = Depends(get_db),
+    _: schemas.Account = Depends(get_current_account)
+):
+    if not exists_animal_with_id(db, animalId):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return StreamingResponse(
+        iter_json_array(iter_visited_location_ids(db, animalId)),
+        media_type="application/json"
+    )
 
 
 @router.post(
@@ -66,10 +96,11 @@ async def add_location_point(
     if not animal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
+    last_visited_location = get_last_visited_location(db, animalId)
     if (animal.lifeStatus == schemas.LifeStatus.DEAD or
-        not animal.visitedLocations and pointId == animal.chippingLocationId or
-        (animal.visitedLocations and 
-        pointId == animal.visitedLocations[-1].locationPointId)):
+        not last_visited_location and pointId == animal.chippingLocationId or
+        (last_visited_location and 
+        pointId == last_visited_location.locationPointId)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
     
     visited_location = create_animal_visited_location(db, animalId, pointId)
@@ -104,9 +135,11 @@ async def change_visited_location(
     if not animal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
-    if (animal.visitedLocations[0].id == change_data.visitedLocationPointId and
+    prev_location = get_previous_visited_location(db, visited_location)
+    next_location = get_next_visited_location(db, visited_location)
+    if (not prev_location and
         change_data.locationPointId == animal.chippingLocationId or
-        is_point_as_prev_or_next(change_data, animal.visitedLocations)):
+        is_point_as_prev_or_next(change_data, prev_location, next_location)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
     update_visited_location(db, change_data)
@@ -137,9 +170,10 @@ async def delete_animal_visited_location(
     if not animal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     
-    if (len(animal.visitedLocations) >=2 and
-        animal.visitedLocations[0].id == visitedPointId and 
-        animal.visitedLocations[1].locationPointId == animal.chippingLocationId):
-        delete_visited_location(db, animal.visitedLocations[1].id)
+    if not get_previous_visited_location(db, visited_location):
+        next_location = get_next_visited_location(db, visited_location)
+        if (next_location and
+            next_location.locationPointId == animal.chippingLocationId):
+            delete_visited_location(db, next_location.id)
     
     delete_visited_location(db, visitedPointId)
\ No newline at end of file
@@ -0,0 +1,69 @@
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from config.config import (
+    VISITED_LOCATIONS_PARTITIONS_AHEAD,
+    SERVER_BIND,
+    SERVER_WORKERS,
+    SERVER_KEEPALIVE,
+    SERVER_BACKLOG,
+    SERVER_TIMEOUT,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_MAX_REQUESTS,
+)
+from db.database import engine, SessionLocal
+from db.models import Base
+from db.partitions import is_partitioned, create_partitions_ahead
+from prestart import create_default_accounts
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def post_fork(server, worker):
+    # Соединения, открытые мастером до fork, не должны использоваться воркерами
+    engine.dispose(close=False)
+
+
+class Application(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+def prepare_database():
+    Base.metadata.create_all(engine)
+    # Партиции на следующие месяцы создаются при каждом запуске, иначе без
+    # cron новые посещения со временем попадут в партицию по умолчанию
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            create_partitions_ahead(connection, VISITED_LOCATIONS_PARTITIONS_AHEAD)
+    with SessionLocal() as db:
+        create_default_accounts(db)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    prepare_database()
+    Application({
+        "bind": SERVER_BIND,
+        "workers": SERVER_WORKERS,
+        "worker_class": "serve.Worker",
+        "preload_app": True,
+        "keepalive": SERVER_KEEPALIVE,
+        "backlog": SERVER_BACKLOG,
+        "timeout": SERVER_TIMEOUT,
+        "graceful_timeout": SERVER_GRACEFUL_TIMEOUT,
+        "max_requests": SERVER_MAX_REQUESTS,
+        "max_requests_jitter": SERVER_MAX_REQUESTS // 10,
+        "post_fork": post_fork,
+    }).run()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Обязательные переменные окружения config.config. Тесты с PostgreSQL запускаются
+# только с TEST_POSTGRESQL_CONFIG: эта база пересоздаётся, её данные теряются
+os.environ.setdefault("PASSWORD_SALT", "test")
+if os.environ.get("TEST_POSTGRESQL_CONFIG"):
+    os.environ["POSTGRESQL_CONFIG"] = os.environ["TEST_POSTGRESQL_CONFIG"]
+os.environ.setdefault("POSTGRESQL_CONFIG", "postgresql+psycopg2://test@localhost/test")
+os.environ.setdefault("TOKEN_SECRET_KEY", "test" * 8)
@@ -0,0 +1,49 @@
+import pytest
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from controllers import middleware
+from controllers.middleware import MetricsMiddleware
+from controllers.query_budget import query_budget
+from db import instrumentation
+from db.instrumentation import QueryBudgetExceeded, instrument_engine
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # То же, что QUERY_DEBUG=true и QUERY_DEBUG_STRICT=true при запуске
+    monkeypatch.setattr(middleware, "QUERY_DEBUG", True)
+    monkeypatch.setattr(instrumentation, "QUERY_DEBUG_STRICT", True)
+
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    def run_statements(count: int):
+        with engine.connect() as connection:
+            for number in range(count):
+                connection.execute(text(f"SELECT {number}"))
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/within", dependencies=[Depends(query_budget(2))])
+    async def within_budget():
+        run_statements(2)
+
+    @app.get("/over", dependencies=[Depends(query_budget(2))])
+    async def over_budget():
+        run_statements(3)
+
+    return TestClient(app)
+
+
+def test_within_budget_passes(client):
+    response = client.get("/within")
+    assert response.status_code == 200
+    assert response.headers["x-query-count"] == "2"
+
+
+def test_over_budget_raises(client):
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/over")
@@ -0,0 +1,85 @@
+import os
+import base64
+import pytest
+from fastapi.testclient import TestClient
+
+from controllers import middleware
+from db import instrumentation
+
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRESQL_CONFIG"),
+    reason="TEST_POSTGRESQL_CONFIG is not set"
+)
+
+ADMIN = {
+    "Authorization": "Basic " + base64.b64encode(b"admin@simbirsoft.com:qwerty123").decode()
+}
+
+
+@pytest.fixture(scope="module")
+def data():
+    import main
+    from prestart import create_default_accounts
+    from db.models import Base
+    from db.database import engine, SessionLocal
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        create_default_accounts(db)
+
+    client = TestClient(main.app)
+    points = [
+        client.post("/locations", json={"latitude": lat, "longitude": lon},
+                    headers=ADMIN).json()["id"]
+        for lat in range(1, 5) for lon in range(1, 5)
+    ]
+    types = [
+        client.post("/animals/types", json={"type": type}, headers=ADMIN).json()["id"]
+        for type in ("cat", "dog", "fox")
+    ]
+    # Животных и посещений больше порога повторов, чтобы N+1 был заметен
+    animals = []
+    for number in range(10):
+        animal = client.post("/animals", json={
+            "animalTypes": types[:number % 3 + 1],
+            "weight": 1, "length": 1, "height": 1,
+            "gender": "MALE",
+            "chipperId": 1,
+            "chippingLocationId": points[number],
+        }, headers=ADMIN).json()
+        for visit in range(3):
+            client.post(f"/animals/{animal['id']}/locations/"
+                        f"{points[(number + visit + 1) % len(points)]}", headers=ADMIN)
+        animals.append(animal["id"])
+    area = client.post("/areas", json={"name": "area", "areaPoints": [
+        {"latitude": 0, "longitude": 0},
+        {"latitude": 0, "longitude": 5},
+        {"latitude": 5, "longitude": 5},
+        {"latitude": 5, "longitude": 0},
+    ]}, headers=ADMIN).json()
+    yield client, animals, area["id"]
+
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def strict(monkeypatch):
+    monkeypatch.setattr(middleware, "QUERY_DEBUG", True)
+    monkeypatch.setattr(instrumentation, "QUERY_DEBUG_STRICT", True)
+
+
+@pytest.mark.parametrize("path", [
+    "/animals/{animal}",
+    "/animals/search?size=50",
+    "/animals/{animal}/locations",
+    "/areas/{area}",
+    "/areas/{area}/analytics?startDate=2000-01-01&endDate=2100-01-01",
+    "/accounts/search",
+])
+def test_route_within_budget(data, strict, path):
+    client, animals, area = data
+    response = client.get(path.format(animal=animals[0], area=area), headers=ADMIN)
+    assert response.status_code == 200
+    assert int(response.headers["x-query-count"]) > 0